@@ -8,11 +8,28 @@
 import pdfplumber
 import json
 import re
-from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
 from typing import List, Dict, Tuple, Optional
 
 
-def extract_spread_rows(pdf, left_page_num: int, right_page_num: int, y_tolerance: int = 5) -> List[Dict]:
+# 行パターン（ループ内で毎回解決しないよう事前にコンパイル）
+# 行の種類は1回のマッチで判定する（ページ番号 → 款 → 項 → 計 → 目 の順に優先）
+_ROW_RE = re.compile(
+    r'(?P<page_number>^-\s*\d+\s*-$)'
+    r'|(?P<kan_header>[（(]?(?P<kan_no>\d+|[０-９]+)款\s+(?P<kan_name>.+?)\s+(?P<kan_amount>[\d,]+)千円)'
+    r'|(?P<kou_header>(?P<kou_no>\d+|[０-９]+)項\s+(?P<kou_name>.+?)\s+(?P<kou_amount>[\d,]+)千円)'
+    r'|(?P<total>計\s+(?P<total_1>[\d,△\-]+)\s+(?P<total_2>[\d,△\-]+)\s+(?P<total_3>[\d,△\-]+))'
+    r'|(?P<moku>(?P<moku_no>\d+)\s+(?P<moku_name>.+?)\s+(?P<moku_1>[\d,△\-]+)\s+(?P<moku_2>[\d,△\-]+)\s+(?P<moku_3>[\d,△\-]+))'
+)
+_AMOUNT_RE = re.compile(r'^[\d,]+$')
+
+# 単位だけのヘッダー行
+_UNIT_HEADER_TEXTS = frozenset(['千円', '千円 千円 千円'])
+
+
+def extract_spread_rows(pdf, left_page_num: int, right_page_num: int,
+                        y_tolerance: int = 5) -> List[Tuple[int, str, str]]:
     """
     見開き2ページをY座標でマッチングして行データを抽出
 
@@ -23,7 +40,7 @@ def extract_spread_rows(pdf, left_page_num: int, right_page_num: int, y_toleranc
         y_tolerance: Y座標のグルーピング許容値（px）
 
     Returns:
-        行ごとのデータリスト
+        [(y, 左側テキスト, 右側テキスト), ...]
     """
     left_page = pdf.pages[left_page_num]
     right_page = pdf.pages[right_page_num]
@@ -33,35 +50,22 @@ def extract_spread_rows(pdf, left_page_num: int, right_page_num: int, y_toleranc
 
     page_width = left_page.width
 
-    # ソースを記録
-    for w in left_words:
-        w['source'] = 'left'
-    for w in right_words:
-        w['source'] = 'right'
-        w['x0'] += page_width
-        w['x1'] += page_width
+    # (Yバケット, X座標, テキスト, 右ページか) に変換する
+    # 右ページのX座標はここでオフセットを足すだけで、元の単語 dict は書き換えない
+    keyed = [(round(w['top'] / y_tolerance) * y_tolerance, w['x0'], w['text'], False)
+             for w in left_words]
+    keyed += [(round(w['top'] / y_tolerance) * y_tolerance, w['x0'] + page_width, w['text'], True)
+              for w in right_words]
 
-    all_words = left_words + right_words
-
-    # Y座標でグループ化
-    y_groups = defaultdict(list)
-    for w in all_words:
-        y = round(w['top'] / y_tolerance) * y_tolerance
-        y_groups[y].append(w)
+    # Y座標のバケット → X座標の順に1回だけソートし、同じバケットを1行にまとめる
+    keyed.sort(key=itemgetter(0, 1))
 
     rows = []
-    for y in sorted(y_groups.keys()):
-        words = sorted(y_groups[y], key=lambda w: w['x0'])
-        left_texts = [w['text'] for w in words if w['source'] == 'left']
-        right_texts = [w['text'] for w in words if w['source'] == 'right']
-
-        rows.append({
-            'y': y,
-            'left': ' '.join(left_texts),
-            'right': ' '.join(right_texts),
-            'left_words': left_texts,
-            'right_words': right_texts,
-        })
+    for y, group in groupby(keyed, key=itemgetter(0)):
+        group = list(group)
+        left_text = ' '.join([text for _, _, text, is_right in group if not is_right])
+        right_text = ' '.join([text for _, _, text, is_right in group if is_right])
+        rows.append((y, left_text, right_text))
 
     return rows
 
@@ -69,10 +73,11 @@ def extract_spread_rows(pdf, left_page_num: int, right_page_num: int, y_toleranc
 def parse_amount(text: str) -> Optional[int]:
     """金額文字列をパース（千円単位）"""
     text = text.replace(',', '').replace('△', '-').replace('千円', '').strip()
-    try:
-        return int(text)
-    except:
+    # 例外に頼らず、符号1文字 + 数字だけの文字列かを先に確かめる
+    digits = text[1:] if text[:1] in ('-', '+') else text
+    if not digits.isdecimal():
         return None
+    return int(text)
 
 
 def parse_right_text(right_text: str) -> List[Dict]:
@@ -87,10 +92,6 @@ def parse_right_text(right_text: str) -> List[Dict]:
 
     results = []
 
-    # 節のパターン: "番号 名称 金額 説明..."
-    # 例: "1 現年課税分 830,000 現年課税分 830,000"
-    setsu_pattern = re.compile(r'(\d+)\s+([^\d\s]+(?:\s+[^\d\s]+)*)\s+([\d,]+)\s+(.*)')
-
     parts = right_text.split()
     i = 0
     while i < len(parts):
@@ -104,7 +105,7 @@ def parse_right_text(right_text: str) -> List[Dict]:
 
             while j < len(parts):
                 # 金額パターン（カンマ区切りの数字）
-                amount_match = re.match(r'^[\d,]+$', parts[j])
+                amount_match = _AMOUNT_RE.match(parts[j])
                 if amount_match and int(parts[j].replace(',', '')) >= 1000:
                     amount = int(parts[j].replace(',', ''))
                     break
@@ -142,49 +143,47 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
     # ヘッダー行
     if '本年度予算額' in left_text or '前年度予算額' in left_text:
         return ('header', None, None)
-    if left_text in ['千円', '千円 千円 千円']:
+    if left_text in _UNIT_HEADER_TEXTS:
         return ('header', None, None)
 
+    m = _ROW_RE.match(left_text)
+    if m is None:
+        return ('unknown', left_text, None)
+    row_type = m.lastgroup
+
     # ページ番号
-    if re.match(r'^-\s*\d+\s*-$', left_text):
+    if row_type == 'page_number':
         return ('page_number', None, None)
 
     # 款ヘッダー（例: １款 市税 46,460,600千円）
-    kan_match = re.match(r'[（(]?(\d+|[０-９]+)款\s+(.+?)\s+([\d,]+)千円', left_text)
-    if kan_match:
-        return ('kan_header', kan_match.group(2), {
-            '番号': kan_match.group(1),
-            '本年度予算額': int(kan_match.group(3).replace(',', '')) * 1000
+    if row_type == 'kan_header':
+        return ('kan_header', m.group('kan_name'), {
+            '番号': m.group('kan_no'),
+            '本年度予算額': int(m.group('kan_amount').replace(',', '')) * 1000
         })
 
     # 項ヘッダー（例: ２項 固定資産税 23,139,800千円）
-    kou_match = re.match(r'(\d+|[０-９]+)項\s+(.+?)\s+([\d,]+)千円', left_text)
-    if kou_match:
-        return ('kou_header', kou_match.group(2), {
-            '番号': kou_match.group(1),
-            '本年度予算額': int(kou_match.group(3).replace(',', '')) * 1000
+    if row_type == 'kou_header':
+        return ('kou_header', m.group('kou_name'), {
+            '番号': m.group('kou_no'),
+            '本年度予算額': int(m.group('kou_amount').replace(',', '')) * 1000
         })
 
     # 計の行（例: 計 887,800 867,400 20,400）
-    total_match = re.match(r'計\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)', left_text)
-    if total_match:
+    if row_type == 'total':
         return ('total', None, {
-            '本年度予算額': parse_amount(total_match.group(1)),
-            '前年度予算額': parse_amount(total_match.group(2)),
-            '比較': parse_amount(total_match.group(3)),
+            '本年度予算額': parse_amount(m.group('total_1')),
+            '前年度予算額': parse_amount(m.group('total_2')),
+            '比較': parse_amount(m.group('total_3')),
         })
 
     # 目の行（例: 1 固定資産税 23,084,800 23,282,800 △198,000）
-    moku_match = re.match(r'(\d+)\s+(.+?)\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)', left_text)
-    if moku_match:
-        return ('moku', moku_match.group(2), {
-            '番号': moku_match.group(1),
-            '本年度予算額': parse_amount(moku_match.group(3)),
-            '前年度予算額': parse_amount(moku_match.group(4)),
-            '比較': parse_amount(moku_match.group(5)),
-        })
-
-    return ('unknown', left_text, None)
+    return ('moku', m.group('moku_name'), {
+        '番号': m.group('moku_no'),
+        '本年度予算額': parse_amount(m.group('moku_1')),
+        '前年度予算額': parse_amount(m.group('moku_2')),
+        '比較': parse_amount(m.group('moku_3')),
+    })
 
 
 def analyze_spread_pages(pdf, left_idx: int, right_idx: int):
@@ -192,36 +191,57 @@ def analyze_spread_pages(pdf, left_idx: int, right_idx: int):
     rows = extract_spread_rows(pdf, left_idx, right_idx)
 
     print(f"\n=== 見開きページ {left_idx+1}-{right_idx+1} ===")
-    for row in rows:
-        row_type, name, data = identify_row_type(row['left'])
+    for y, left_text, right_text in rows:
+        row_type, name, data = identify_row_type(left_text)
         if row_type not in ['empty', 'header', 'page_number']:
-            print(f"y={row['y']:5.0f} [{row_type:12s}] {name or ''}")
+            print(f"y={y:5.0f} [{row_type:12s}] {name or ''}")
             if data:
                 print(f"           データ: {data}")
-            if row['right']:
-                setsu_list = parse_right_text(row['right'])
+            if right_text:
+                setsu_list = parse_right_text(right_text)
                 if setsu_list:
                     for s in setsu_list:
                         print(f"           節: {s}")
 
 
-def find_budget_pages(pdf) -> Dict[str, List[int]]:
-    """予算書の歳入・歳出ページ範囲を特定"""
+def find_budget_pages(pdf, hint: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+                      ) -> Dict[str, List[int]]:
+    """
+    予算書の歳入・歳出ページ範囲を特定
+
+    Args:
+        pdf: pdfplumberのPDFオブジェクト
+        hint: 既知のページ範囲 ((歳入開始, 歳入終了), (歳出開始, 歳出終了))（1-indexed）
+              例: ((28, 175), (176, 596))。指定すると extract_text() による全ページ走査をしない
+
+    Returns:
+        {'歳入': [ページ番号, ...], '歳出': [ページ番号, ...]}（0-indexed）
+    """
+    total_pages = len(pdf.pages)
+
+    if hint is not None:
+        (sainyuu_start, sainyuu_end), (saishutsu_start, saishutsu_end) = hint
+        return {
+            '歳入': list(range(sainyuu_start - 1, min(sainyuu_end, total_pages))),
+            '歳出': list(range(saishutsu_start - 1, min(saishutsu_end, total_pages))),
+        }
 
+    # 範囲が分からない場合は全ページを調べる
+    # （歳入・歳出の文字を含まない詳細ページも混ざるため、境界の二分探索はできない）
     result = {'歳入': [], '歳出': []}
 
-    for i in range(len(pdf.pages)):
+    for i in range(total_pages):
         text = pdf.pages[i].extract_text() or ""
 
-        # 歳入の詳細ページ
-        if '歳入' in text and ('款' in text or '項' in text) and '節' in text:
-            if i not in result['歳入']:
-                result['歳入'].append(i)
+        # 款・項・節を含む詳細ページか（歳入・歳出で共通の判定は1回だけ行う）
+        if not (('款' in text or '項' in text) and '節' in text):
+            continue
 
-        # 歳出の詳細ページ
-        if '歳出' in text and ('款' in text or '項' in text) and '節' in text:
-            if i not in result['歳出']:
-                result['歳出'].append(i)
+        # ページは昇順に1回ずつしか見ないので重複チェックは不要
+        if '歳入' in text:
+            result['歳入'].append(i)
+        if '歳出' in text:
+            result['歳出'].append(i)
 
     return result
 
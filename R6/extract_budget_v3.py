@@ -7,54 +7,65 @@
 
 import pdfplumber
 import json
+import os
 import re
-from collections import defaultdict
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Dict, Tuple, Optional, Iterable
+
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
 
 
 # ページ範囲定義
 SAINYUU_PAGES = (28, 175)  # 0-indexed: 27-174
 SAISHUTSU_PAGES = (176, 596)  # 0-indexed: 175-595（予備費まで含む）
 
+# 行パターン（ループ内で毎回解決しないよう事前にコンパイル）
+_PAGE_NUM_RE = re.compile(r'^-\s*\d+\s*-$')
+_KAN_RE = re.compile(r'[（(]?(\d+|[０-９]+)款\s+(.+?)\s+([\d,]+)千円')
+_KOU_RE = re.compile(r'(\d+|[０-９]+)項\s+(.+?)\s+([\d,]+)千円')
+_TOTAL_RE = re.compile(r'計\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)')
+_MOKU_RE = re.compile(r'(\d+)\s+(.+?)\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)')
 
-def extract_spread_rows(pdf, left_page_num: int, right_page_num: int, y_tolerance: int = 12) -> List[Dict]:
-    """見開き2ページをY座標でマッチングして行データを抽出"""
-    if left_page_num >= len(pdf.pages) or right_page_num >= len(pdf.pages):
-        return []
+# 単位だけのヘッダー行
+_UNIT_HEADER_TEXTS = frozenset(['千円', '千円 千円 千円'])
 
-    left_page = pdf.pages[left_page_num]
-    right_page = pdf.pages[right_page_num]
+# 予算構造の組み立てに使わない行タイプ
+_SKIP_ROW_TYPES = frozenset(['empty', 'header', 'page_number', 'unknown'])
 
+
+def extract_spread_rows(left_page, right_page, y_tolerance: int = 12) -> List[Tuple[int, str, str]]:
+    """
+    見開き2ページ（pdfplumberのPageオブジェクト）をY座標でマッチングして行データを抽出
+
+    Returns:
+        [(y, 左側テキスト, 右側テキスト), ...]
+    """
     left_words = left_page.extract_words()
     right_words = right_page.extract_words()
 
     page_width = left_page.width
 
-    for w in left_words:
-        w['source'] = 'left'
-    for w in right_words:
-        w['source'] = 'right'
-        w['x0'] += page_width
-        w['x1'] += page_width
+    # (Yバケット, X座標, テキスト, 右ページか) に変換する
+    # 右ページのX座標はここでオフセットを足すだけで、元の単語 dict は書き換えない
+    keyed = [(round(w['top'] / y_tolerance) * y_tolerance, w['x0'], w['text'], False)
+             for w in left_words]
+    keyed += [(round(w['top'] / y_tolerance) * y_tolerance, w['x0'] + page_width, w['text'], True)
+              for w in right_words]
 
-    all_words = left_words + right_words
-
-    y_groups = defaultdict(list)
-    for w in all_words:
-        y = round(w['top'] / y_tolerance) * y_tolerance
-        y_groups[y].append(w)
+    # Y座標のバケット → X座標の順に1回だけソートし、同じバケットを1行にまとめる
+    keyed.sort(key=itemgetter(0, 1))
 
     rows = []
-    for y in sorted(y_groups.keys()):
-        words = sorted(y_groups[y], key=lambda w: w['x0'])
-        left_texts = [w['text'] for w in words if w['source'] == 'left']
-        right_texts = [w['text'] for w in words if w['source'] == 'right']
-
-        rows.append({
-            'y': y,
-            'left': ' '.join(left_texts),
-            'right': ' '.join(right_texts),
-        })
+    for y, group in groupby(keyed, key=itemgetter(0)):
+        group = list(group)
+        left_text = ' '.join([text for _, _, text, is_right in group if not is_right])
+        right_text = ' '.join([text for _, _, text, is_right in group if is_right])
+        rows.append((y, left_text, right_text))
 
     return rows
 
@@ -64,10 +75,11 @@ def parse_amount(text: str) -> Optional[int]:
     if not text:
         return None
     text = text.replace(',', '').replace('△', '-').replace('千円', '').strip()
-    try:
-        return int(text) * 1000  # 千円単位を円に変換
-    except:
+    # 例外に頼らず、符号1文字 + 数字だけの文字列かを先に確かめる
+    digits = text[1:] if text[:1] in ('-', '+') else text
+    if not digits.isdecimal():
         return None
+    return int(text) * 1000  # 千円単位を円に変換
 
 
 def parse_amount_raw(text: str) -> Optional[int]:
@@ -75,51 +87,65 @@ def parse_amount_raw(text: str) -> Optional[int]:
     if not text:
         return None
     text = text.replace(',', '').replace('△', '-').strip()
-    try:
-        return int(text)
-    except:
+    # 例外に頼らず、符号1文字 + 数字だけの文字列かを先に確かめる
+    digits = text[1:] if text[:1] in ('-', '+') else text
+    if not digits.isdecimal():
         return None
+    return int(text)
 
 
-def parse_right_setsu(right_text: str) -> List[Dict]:
-    """右側テキストから節・説明を抽出"""
-    if not right_text.strip():
-        return []
-
-    results = []
-    parts = right_text.split()
+def _scan_setsu_tokens(parts: List[str]) -> List[Tuple[int, int, int]]:
+    """
+    トークン列から節の位置を探す
 
+    Returns:
+        [(節番号の位置, 金額の位置, 金額（円）), ...]
+    """
+    spans = []
+    n = len(parts)
     i = 0
-    while i < len(parts):
+    while i < n:
         if parts[i].isdigit():
-            setsu_num = int(parts[i])
+            # 節番号の次から最初の金額（100以上）の手前までが節名
             j = i + 1
-            name_parts = []
             amount = None
-
-            while j < len(parts):
-                amount_match = re.match(r'^[\d,]+$', parts[j])
-                if amount_match:
-                    val = int(parts[j].replace(',', ''))
+            while j < n:
+                # 数字とカンマだけのトークンが金額候補（正規表現 ^[\d,]+$ と同じ判定）
+                digits = parts[j].replace(',', '')
+                if digits.isdecimal():
+                    val = int(digits)
                     if val >= 100:  # 金額と判断
                         amount = val * 1000  # 千円→円
                         break
-                name_parts.append(parts[j])
                 j += 1
 
-            if name_parts and amount is not None:
-                name = ''.join(name_parts)  # スペースなしで結合
-                explanation = ' '.join(parts[j+1:]) if j + 1 < len(parts) else ''
-                results.append({
-                    '節名': name,
-                    '金額': amount,
-                    '説明_raw': explanation,
-                })
+            if amount is not None and j > i + 1:
+                spans.append((i, j, amount))
                 # 次の節を探す
                 i = j + 1
                 continue
         i += 1
 
+    return spans
+
+
+def parse_right_setsu(right_text: str) -> List[Dict]:
+    """右側テキストから節・説明を抽出"""
+    if not right_text.strip():
+        return []
+
+    results = []
+    parts = right_text.split()
+
+    for i, j, amount in _scan_setsu_tokens(parts):
+        name = ''.join(parts[i + 1:j])  # スペースなしで結合
+        explanation = ' '.join(parts[j+1:]) if j + 1 < len(parts) else ''
+        results.append({
+            '節名': name,
+            '金額': amount,
+            '説明_raw': explanation,
+        })
+
     return results
 
 
@@ -132,13 +158,13 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
 
     if '本年度予算額' in left_text or '前年度予算額' in left_text:
         return ('header', None, None)
-    if left_text in ['千円', '千円 千円 千円']:
+    if left_text in _UNIT_HEADER_TEXTS:
         return ('header', None, None)
-    if re.match(r'^-\s*\d+\s*-$', left_text):
+    if _PAGE_NUM_RE.match(left_text):
         return ('page_number', None, None)
 
     # 款ヘッダー
-    kan_match = re.match(r'[（(]?(\d+|[０-９]+)款\s+(.+?)\s+([\d,]+)千円', left_text)
+    kan_match = _KAN_RE.match(left_text)
     if kan_match:
         return ('kan_header', kan_match.group(2), {
             '番号': kan_match.group(1),
@@ -146,7 +172,7 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
         })
 
     # 項ヘッダー
-    kou_match = re.match(r'(\d+|[０-９]+)項\s+(.+?)\s+([\d,]+)千円', left_text)
+    kou_match = _KOU_RE.match(left_text)
     if kou_match:
         return ('kou_header', kou_match.group(2), {
             '番号': kou_match.group(1),
@@ -154,7 +180,7 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
         })
 
     # 計の行
-    total_match = re.match(r'計\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)', left_text)
+    total_match = _TOTAL_RE.match(left_text)
     if total_match:
         return ('total', None, {
             '本年度予算額': parse_amount(total_match.group(1)),
@@ -163,7 +189,7 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
         })
 
     # 目の行
-    moku_match = re.match(r'(\d+)\s+(.+?)\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)', left_text)
+    moku_match = _MOKU_RE.match(left_text)
     if moku_match:
         return ('moku', moku_match.group(2), {
             '番号': moku_match.group(1),
@@ -175,37 +201,67 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
     return ('unknown', left_text, None)
 
 
-def process_spread_pages(pdf, left_idx: int, right_idx: int) -> List[Dict]:
-    """見開きページを処理してデータ行を返す"""
-    rows = extract_spread_rows(pdf, left_idx, right_idx)
+def process_spread_pages(pdf, left_idx: int, right_idx: int) -> List[Tuple]:
+    """
+    見開きページを処理してデータ行を返す
+
+    Returns:
+        [(row_type, name, data, 節リスト or None), ...]
+        節リストは節のある目の行のみ
+    """
+    if left_idx >= len(pdf.pages) or right_idx >= len(pdf.pages):
+        return []
+
+    left_page = pdf.pages[left_idx]
+    right_page = pdf.pages[right_idx]
+    rows = extract_spread_rows(left_page, right_page)
+
+    # 解析済みページのキャッシュ（文字・図形オブジェクト）を解放し、
+    # 400ページ規模でもメモリ使用量が増え続けないようにする
+    left_page.close()
+    right_page.close()
+
     result = []
 
-    for row in rows:
-        row_type, name, data = identify_row_type(row['left'])
+    for _, left_text, right_text in rows:
+        row_type, name, data = identify_row_type(left_text)
 
-        if row_type in ['empty', 'header', 'page_number', 'unknown']:
+        if row_type in _SKIP_ROW_TYPES:
             continue
 
-        entry = {
-            'type': row_type,
-            'name': name,
-            'data': data or {},
-        }
-
         # 右側から節を抽出
+        setsu_list = None
         if row_type == 'moku':
-            setsu_list = parse_right_setsu(row['right'])
-            if setsu_list:
-                entry['節'] = setsu_list
+            setsu_list = parse_right_setsu(right_text) or None
 
-        result.append(entry)
+        result.append((row_type, name, data, setsu_list))
 
     return result
 
 
-def build_budget_structure(pdf, start_page: int, end_page: int) -> Dict:
+# ワーカープロセスごとに開いたPDF（プロセス終了まで保持）
+_worker_pdf = None
+
+
+def _init_worker(pdf_path: str):
+    """ワーカープロセスの初期化: PDFを1回だけ開く"""
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(pdf_path)
+
+
+def _process_spread_pages(left_idx: int) -> List[Tuple]:
+    """ワーカープロセス用: 開いておいたPDFで見開きを処理"""
+    return process_spread_pages(_worker_pdf, left_idx, left_idx + 1)
+
+
+def spread_indices(start_page: int, end_page: int, total_pages: int) -> range:
+    """ページ範囲（1-indexed）から見開きの左ページ番号（0-indexed）を返す"""
+    return range(start_page - 1, min(end_page, total_pages) - 1, 2)
+
+
+def build_budget_structure(spreads: Iterable[List[Tuple]]) -> Dict:
     """
-    指定ページ範囲から予算構造を構築
+    処理済みの見開き（process_spread_pages の結果）をページ順に受け取り予算構造を構築
 
     Returns:
         {"款": [{"款名": {..., "項": [...]}}]}
@@ -214,71 +270,64 @@ def build_budget_structure(pdf, start_page: int, end_page: int) -> Dict:
 
     current_kan = None
     current_kou = None
+    current_kou_index = {}  # 現在の款に追加済みの 項名 → 項
     current_moku_list = []
 
-    # 見開きページペアで処理
-    for left_idx in range(start_page - 1, end_page - 1, 2):
-        right_idx = left_idx + 1
-        if right_idx >= len(pdf.pages):
-            break
-
-        entries = process_spread_pages(pdf, left_idx, right_idx)
-
-        for entry in entries:
-            if entry['type'] == 'kan_header':
+    # 見開きページペアごとの行データを順に処理
+    for entries in spreads:
+        for row_type, name, data, setsu_list in entries:
+            if row_type == 'kan_header':
                 # 新しい款
-                kan_name = entry['name']
+                kan_name = name
                 if current_kan is None or list(current_kan.keys())[0] != kan_name:
                     # 前の款を保存
                     if current_kan:
                         result['款'].append(current_kan)
                     current_kan = {
                         kan_name: {
-                            '本年度予算額': entry['data'].get('本年度予算額'),
+                            '本年度予算額': data.get('本年度予算額'),
                             '項': []
                         }
                     }
                     current_kou = None
+                    current_kou_index = {}
 
-            elif entry['type'] == 'kou_header':
+            elif row_type == 'kou_header':
                 # 新しい項
-                kou_name = entry['name']
+                kou_name = name
                 if current_kan:
                     kan_name = list(current_kan.keys())[0]
                     # 同じ項が既にあるかチェック
-                    existing = None
-                    for k in current_kan[kan_name]['項']:
-                        if list(k.keys())[0] == kou_name:
-                            existing = k
-                            break
+                    existing = current_kou_index.get(kou_name)
 
                     if existing is None:
                         current_kou = {
                             kou_name: {
-                                '本年度予算額': entry['data'].get('本年度予算額'),
+                                '本年度予算額': data.get('本年度予算額'),
                                 '目': []
                             }
                         }
                         current_kan[kan_name]['項'].append(current_kou)
+                        current_kou_index[kou_name] = current_kou
                     else:
                         current_kou = existing
 
-            elif entry['type'] == 'moku':
+            elif row_type == 'moku':
                 # 目
-                moku_name = entry['name']
+                moku_name = name
                 if current_kou:
                     kou_name = list(current_kou.keys())[0]
 
                     moku_data = {
-                        '本年度予算額': entry['data'].get('本年度予算額'),
-                        '前年度予算額': entry['data'].get('前年度予算額'),
-                        '比較': entry['data'].get('比較'),
+                        '本年度予算額': data.get('本年度予算額'),
+                        '前年度予算額': data.get('前年度予算額'),
+                        '比較': data.get('比較'),
                     }
 
                     # 節を追加
-                    if '節' in entry:
+                    if setsu_list:
                         moku_data['節'] = []
-                        for s in entry['節']:
+                        for s in setsu_list:
                             setsu_entry = {
                                 s['節名']: {
                                     '金額': s['金額'],
@@ -301,34 +350,60 @@ def build_budget_structure(pdf, start_page: int, end_page: int) -> Dict:
 def main():
     import sys
 
-    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "bugget.pdf"
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    # -p: 標準出力もインデント付きで出力する
+    pretty = '-p' in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != '-p']
+
+    pdf_path = args[0] if len(args) > 0 else "bugget.pdf"
+    output_path = args[1] if len(args) > 1 else None
 
     with pdfplumber.open(pdf_path) as pdf:
-        print(f"PDF: {pdf_path}", file=sys.stderr)
-        print(f"総ページ数: {len(pdf.pages)}", file=sys.stderr)
+        total_pages = len(pdf.pages)
+    print(f"PDF: {pdf_path}", file=sys.stderr)
+    print(f"総ページ数: {total_pages}", file=sys.stderr)
+
+    # 見開きごとのページ処理は互いに独立しているのでプロセス並列で行い、
+    # 款・項・目の状態管理は結果をページ順に受け取って直列で行う
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker,
+                             initargs=(pdf_path,)) as executor:
+        # 歳入・歳出の見開きを先にまとめて投入し、歳入の組み立て中も歳出のページ処理を進める
+        sainyuu_spreads = executor.map(
+            _process_spread_pages, spread_indices(*SAINYUU_PAGES, total_pages), chunksize=4)
+        saishutsu_spreads = executor.map(
+            _process_spread_pages, spread_indices(*SAISHUTSU_PAGES, total_pages), chunksize=4)
 
         # 歳入を抽出
         print("歳入を抽出中...", file=sys.stderr)
-        sainyuu = build_budget_structure(pdf, SAINYUU_PAGES[0], SAINYUU_PAGES[1])
+        sainyuu = build_budget_structure(sainyuu_spreads)
         print(f"  歳入: {len(sainyuu['款'])}款", file=sys.stderr)
 
         # 歳出を抽出
         print("歳出を抽出中...", file=sys.stderr)
-        saishutsu = build_budget_structure(pdf, SAISHUTSU_PAGES[0], SAISHUTSU_PAGES[1])
+        saishutsu = build_budget_structure(saishutsu_spreads)
         print(f"  歳出: {len(saishutsu['款'])}款", file=sys.stderr)
 
-        result = {
-            "歳入": sainyuu,
-            "歳出": saishutsu,
-        }
-
-        if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            print(f"出力: {output_path}", file=sys.stderr)
-        else:
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+    result = {
+        "歳入": sainyuu,
+        "歳出": saishutsu,
+    }
+
+    # ファイルはインデント付きで出力し、標準出力はパイプで渡す前提で詰めて出力する（-p で整形）
+    # orjson はインデント付きの整形もCで行う（json.dumps(ensure_ascii=False, indent=2) と同じ出力）
+    pretty = pretty or output_path is not None
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        output = orjson.dumps(result, option=option)
+    elif pretty:
+        output = json.dumps(result, ensure_ascii=False, indent=2).encode('utf-8')
+    else:
+        output = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(output)
+        print(f"出力: {output_path}", file=sys.stderr)
+    else:
+        sys.stdout.buffer.write(output + b'\n')
 
 
 if __name__ == "__main__":
@@ -7,39 +7,102 @@
 
 import pdfplumber
 import json
+import os
 import re
-from collections import defaultdict
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import List, Dict, Tuple, Optional, Iterable
+
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
 
 
 SAINYUU_PAGES = (28, 175)
 SAISHUTSU_PAGES = (176, 596)
 
+# 行パターン（ループ内で毎回解決しないよう事前にコンパイル）
+_PAGE_NUM_RE = re.compile(r'^-\s*\d+\s*-$')
+# 行の種類は1回のマッチで判定する（ページ番号 → 款 → 項 → 計 → 目 の順に優先）
+_ROW_RE = re.compile(
+    r'(?P<page_number>^-\s*\d+\s*-$)'
+    r'|(?P<kan_header>[（(]?(?P<kan_no>\d+|[０-９]+)款\s+(?P<kan_name>.+?)\s+(?P<kan_amount>[\d,]+)千円)'
+    r'|(?P<kou_header>(?P<kou_no>\d+|[０-９]+)項\s+(?P<kou_name>.+?)\s+(?P<kou_amount>[\d,]+)千円)'
+    r'|(?P<total>計\s+(?P<total_1>[\d,△\-]+)\s+(?P<total_2>[\d,△\-]+)\s+(?P<total_3>[\d,△\-]+))'
+    r'|(?P<moku>(?P<moku_no>\d+)\s+(?P<moku_name>.+?)\s+(?P<moku_1>[\d,△\-]+)\s+(?P<moku_2>[\d,△\-]+)\s+(?P<moku_3>[\d,△\-]+))'
+)
+_SETSU_LINE_RE = re.compile(r'^(\d+)\s+([^\d\s]+(?:\s*[^\d\s]+)*?)\s+([\d,]+)\s+(.*)$')
+_ITEM_RE = re.compile(r'^([^\d]+?)\s*([\d,]+)$')
+
+# 単位だけのヘッダー行（左ページ / 右ページの節欄）
+_UNIT_HEADER_TEXTS = frozenset(['千円', '千円 千円 千円'])
+_SETSU_UNIT_HEADER_TEXTS = frozenset(['千円', '千円 千円'])
+
+
+def _extract_words_fast(page, x_tolerance: float = 3, y_tolerance: float = 3) -> List[Dict]:
+    """
+    page.chars を直接まとめて単語を作る（extract_words() の簡易版）
 
-def extract_right_page_setsu(pdf, page_num: int) -> List[Dict]:
+    文字を top の近いもの同士で行にまとめ、行内をX座標順に並べて
+    空白文字か x_tolerance を超える隙間で単語を区切る。
+    このスクリプトが使う text / x0 / x1 / top / bottom だけを返す。
+    """
+    chars = sorted(page.chars, key=itemgetter('top', 'x0'))
+
+    # top の差が y_tolerance 以内の文字を同じ行とみなす
+    lines = []
+    line = []
+    line_top = None
+    for c in chars:
+        if line and c['top'] - line_top > y_tolerance:
+            lines.append(line)
+            line = []
+        if not line:
+            line_top = c['top']
+        line.append(c)
+    if line:
+        lines.append(line)
+
+    words = []
+    for line in lines:
+        line.sort(key=itemgetter('x0'))
+        current = None
+        for c in line:
+            if c['text'].isspace():
+                current = None
+                continue
+            if current is not None and c['x0'] - current['x1'] <= x_tolerance:
+                current['text'] += c['text']
+                current['x1'] = c['x1']
+                current['top'] = min(current['top'], c['top'])
+                current['bottom'] = max(current['bottom'], c['bottom'])
+            else:
+                current = {'text': c['text'], 'x0': c['x0'], 'x1': c['x1'],
+                           'top': c['top'], 'bottom': c['bottom']}
+                words.append(current)
+
+    return words
+
+
+def extract_right_page_setsu(words: List[Dict]) -> List[Dict]:
     """
     右ページから節データを詳細に抽出
 
+    Args:
+        words: 右ページの extract_words() 結果
+
     Returns:
         [{"節名": str, "金額": int, "説明": {...}, "y_start": float}, ...]
     """
-    if page_num >= len(pdf.pages):
-        return []
-
-    page = pdf.pages[page_num]
-    words = page.extract_words()
+    # Y座標（5px単位）→ X座標の順に1回だけソートし、同じY座標の単語を1行にまとめる
+    keyed = [(round(w['top'] / 5) * 5, w['x0'], w['text']) for w in words]
+    keyed.sort(key=itemgetter(0, 1))
 
-    # Y座標でグループ化（5px単位）
-    y_groups = defaultdict(list)
-    for w in words:
-        y = round(w['top'] / 5) * 5
-        y_groups[y].append(w)
-
-    # 行をY座標順にソート
     lines = []
-    for y in sorted(y_groups.keys()):
-        texts = [w['text'] for w in sorted(y_groups[y], key=lambda w: w['x0'])]
-        line_text = ' '.join(texts)
+    for y, group in groupby(keyed, key=itemgetter(0)):
+        line_text = ' '.join([text for _, _, text in group])
         lines.append({'y': y, 'text': line_text})
 
     # 節の開始を検出してグループ化
@@ -55,13 +118,13 @@ def extract_right_page_setsu(pdf, page_num: int) -> List[Dict]:
             continue
         if '区 分' in text or '金 額' in text:
             continue
-        if text.strip() in ['千円', '千円 千円']:
+        if text.strip() in _SETSU_UNIT_HEADER_TEXTS:
             continue
-        if re.match(r'^-\s*\d+\s*-$', text):
+        if _PAGE_NUM_RE.match(text):
             continue
 
         # 節の開始パターン: "番号 名称 金額 ..."
-        setsu_match = re.match(r'^(\d+)\s+([^\d\s]+(?:\s*[^\d\s]+)*?)\s+([\d,]+)\s+(.*)$', text)
+        setsu_match = _SETSU_LINE_RE.match(text)
         if setsu_match:
             # 新しい節の開始
             if current_setsu:
@@ -127,7 +190,7 @@ def parse_setsumei_lines(lines: List[str], setsu_name: str) -> Dict:
             continue
 
         # 金額付き項目パターン: "名称 金額"
-        item_match = re.match(r'^([^\d]+?)\s*([\d,]+)$', line)
+        item_match = _ITEM_RE.match(line)
         if item_match:
             item_name = item_match.group(1).strip()
             item_amount = int(item_match.group(2).replace(',', '')) * 1000
@@ -158,43 +221,36 @@ def parse_setsumei_lines(lines: List[str], setsu_name: str) -> Dict:
     return result
 
 
-def extract_spread_rows(pdf, left_page_num: int, right_page_num: int, y_tolerance: int = 12) -> List[Dict]:
-    """見開き2ページをY座標でマッチングして行データを抽出"""
-    if left_page_num >= len(pdf.pages) or right_page_num >= len(pdf.pages):
-        return []
-
-    left_page = pdf.pages[left_page_num]
-    right_page = pdf.pages[right_page_num]
-
-    left_words = left_page.extract_words()
-    right_words = right_page.extract_words()
-
-    page_width = left_page.width
+def extract_spread_rows(left_words: List[Dict], right_words: List[Dict], page_width: float,
+                        y_tolerance: int = 12) -> List[Tuple[int, str, str]]:
+    """
+    見開き2ページをY座標でマッチングして行データを抽出
 
-    for w in left_words:
-        w['source'] = 'left'
-    for w in right_words:
-        w['source'] = 'right'
-        w['x0'] += page_width
+    Args:
+        left_words: 左ページの extract_words() 結果
+        right_words: 右ページの extract_words() 結果
+        page_width: 左ページの幅（右ページのX座標オフセット）
+        y_tolerance: Y座標のグルーピング許容値（px）
 
-    all_words = left_words + right_words
+    Returns:
+        [(y, 左側テキスト, 右側テキスト), ...]
+    """
+    # (Yバケット, X座標, テキスト, 右ページか) に変換する
+    # 右ページのX座標はここでオフセットを足すだけで、元の単語 dict は書き換えない
+    keyed = [(round(w['top'] / y_tolerance) * y_tolerance, w['x0'], w['text'], False)
+             for w in left_words]
+    keyed += [(round(w['top'] / y_tolerance) * y_tolerance, w['x0'] + page_width, w['text'], True)
+              for w in right_words]
 
-    y_groups = defaultdict(list)
-    for w in all_words:
-        y = round(w['top'] / y_tolerance) * y_tolerance
-        y_groups[y].append(w)
+    # Y座標のバケット → X座標の順に1回だけソートし、同じバケットを1行にまとめる
+    keyed.sort(key=itemgetter(0, 1))
 
     rows = []
-    for y in sorted(y_groups.keys()):
-        words = sorted(y_groups[y], key=lambda w: w['x0'])
-        left_texts = [w['text'] for w in words if w['source'] == 'left']
-        right_texts = [w['text'] for w in words if w['source'] == 'right']
-
-        rows.append({
-            'y': y,
-            'left': ' '.join(left_texts),
-            'right': ' '.join(right_texts),
-        })
+    for y, group in groupby(keyed, key=itemgetter(0)):
+        group = list(group)
+        left_text = ' '.join([text for _, _, text, is_right in group if not is_right])
+        right_text = ' '.join([text for _, _, text, is_right in group if is_right])
+        rows.append((y, left_text, right_text))
 
     return rows
 
@@ -204,10 +260,11 @@ def parse_amount(text: str) -> Optional[int]:
     if not text:
         return None
     text = text.replace(',', '').replace('△', '-').replace('千円', '').strip()
-    try:
-        return int(text) * 1000
-    except:
+    # 例外に頼らず、符号1文字 + 数字だけの文字列かを先に確かめる
+    digits = text[1:] if text[:1] in ('-', '+') else text
+    if not digits.isdecimal():
         return None
+    return int(text) * 1000
 
 
 def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict]]:
@@ -219,137 +276,180 @@ def identify_row_type(left_text: str) -> Tuple[str, Optional[str], Optional[Dict
 
     if '本年度予算額' in left_text or '前年度予算額' in left_text:
         return ('header', None, None)
-    if left_text in ['千円', '千円 千円 千円']:
+    if left_text in _UNIT_HEADER_TEXTS:
         return ('header', None, None)
-    if re.match(r'^-\s*\d+\s*-$', left_text):
+    m = _ROW_RE.match(left_text)
+    if m is None:
+        return ('unknown', left_text, None)
+
+    row_type = m.lastgroup
+    if row_type == 'page_number':
         return ('page_number', None, None)
 
-    kan_match = re.match(r'[（(]?(\d+|[０-９]+)款\s+(.+?)\s+([\d,]+)千円', left_text)
-    if kan_match:
-        return ('kan_header', kan_match.group(2), {
-            '番号': kan_match.group(1),
-            '本年度予算額': parse_amount(kan_match.group(3)),
+    if row_type == 'kan_header':
+        return ('kan_header', m.group('kan_name'), {
+            '番号': m.group('kan_no'),
+            '本年度予算額': parse_amount(m.group('kan_amount')),
         })
 
-    kou_match = re.match(r'(\d+|[０-９]+)項\s+(.+?)\s+([\d,]+)千円', left_text)
-    if kou_match:
-        return ('kou_header', kou_match.group(2), {
-            '番号': kou_match.group(1),
-            '本年度予算額': parse_amount(kou_match.group(3)),
+    if row_type == 'kou_header':
+        return ('kou_header', m.group('kou_name'), {
+            '番号': m.group('kou_no'),
+            '本年度予算額': parse_amount(m.group('kou_amount')),
         })
 
-    total_match = re.match(r'計\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)', left_text)
-    if total_match:
+    if row_type == 'total':
         return ('total', None, {
-            '本年度予算額': parse_amount(total_match.group(1)),
-            '前年度予算額': parse_amount(total_match.group(2)),
-            '比較': parse_amount(total_match.group(3)),
+            '本年度予算額': parse_amount(m.group('total_1')),
+            '前年度予算額': parse_amount(m.group('total_2')),
+            '比較': parse_amount(m.group('total_3')),
         })
 
-    moku_match = re.match(r'(\d+)\s+(.+?)\s+([\d,△\-]+)\s+([\d,△\-]+)\s+([\d,△\-]+)', left_text)
-    if moku_match:
-        return ('moku', moku_match.group(2), {
-            '番号': moku_match.group(1),
-            '本年度予算額': parse_amount(moku_match.group(3)),
-            '前年度予算額': parse_amount(moku_match.group(4)),
-            '比較': parse_amount(moku_match.group(5)),
-        })
+    # 目の行
+    return ('moku', m.group('moku_name'), {
+        '番号': m.group('moku_no'),
+        '本年度予算額': parse_amount(m.group('moku_1')),
+        '前年度予算額': parse_amount(m.group('moku_2')),
+        '比較': parse_amount(m.group('moku_3')),
+    })
 
-    return ('unknown', left_text, None)
 
+def process_spread(pdf, left_idx: int, fast: bool = False) -> Tuple[List[Tuple], List[Dict]]:
+    """
+    見開きページを解析して款・項・目の行と右ページの節を返す
 
-def build_budget_structure(pdf, start_page: int, end_page: int) -> Dict:
-    """指定ページ範囲から予算構造を構築"""
-    result = {"款": []}
+    Args:
+        fast: True の場合 extract_words() の代わりに _extract_words_fast() を使う
 
-    current_kan = None
-    current_kou = None
+    Returns:
+        ([(y, row_type, name, data), ...], [節データ, ...])
+        行は kan_header / kou_header / moku のみ
+    """
+    left_page = pdf.pages[left_idx]
+    right_page = pdf.pages[left_idx + 1]
 
-    for left_idx in range(start_page - 1, end_page - 1, 2):
-        right_idx = left_idx + 1
-        if right_idx >= len(pdf.pages):
-            break
+    # 単語抽出はページごとに1回だけ行う（右ページは行抽出と節抽出で共用）
+    extract_words = _extract_words_fast if fast else lambda page: page.extract_words()
+    left_words = extract_words(left_page)
+    right_words = extract_words(right_page)
+    page_width = left_page.width
 
-        # 左ページから款・項・目を抽出
-        left_rows = extract_spread_rows(pdf, left_idx, right_idx)
+    # 解析済みページのキャッシュ（文字・図形オブジェクト）を解放し、
+    # 600ページ規模でもメモリ使用量が増え続けないようにする
+    left_page.close()
+    right_page.close()
 
-        # 右ページから節の詳細を抽出
-        right_setsu_list = extract_right_page_setsu(pdf, right_idx)
+    # 右ページから節の詳細を抽出
+    right_setsu_list = extract_right_page_setsu(right_words)
 
-        # 目の行とそのY座標を収集
-        moku_rows = []
-        for row in left_rows:
-            row_type, name, data = identify_row_type(row['left'])
-            if row_type == 'moku':
-                moku_rows.append({'y': row['y'], 'name': name, 'data': data, 'row': row})
+    # 左ページから款・項・目を抽出
+    rows = []
+    for y, left_text, _ in extract_spread_rows(left_words, right_words, page_width):
+        row_type, name, data = identify_row_type(left_text)
+        if row_type in ('kan_header', 'kou_header', 'moku'):
+            rows.append((y, row_type, name, data))
+
+    return rows, right_setsu_list
+
+
+# ワーカープロセスごとに開いたPDF（プロセス終了まで保持）と単語抽出の方式
+_worker_pdf = None
+_worker_fast = False
+
+
+def _init_worker(pdf_path: str, fast: bool = False):
+    """ワーカープロセスの初期化: PDFを1回だけ開く"""
+    global _worker_pdf, _worker_fast
+    _worker_pdf = pdfplumber.open(pdf_path)
+    _worker_fast = fast
+
+
+def _process_spread(left_idx: int) -> Tuple[List[Tuple], List[Dict]]:
+    """ワーカープロセス用: 開いておいたPDFで見開きを解析"""
+    return process_spread(_worker_pdf, left_idx, _worker_fast)
+
+
+def spread_indices(start_page: int, end_page: int, total_pages: int) -> range:
+    """ページ範囲（1-indexed）から見開きの左ページ番号（0-indexed）を返す"""
+    return range(start_page - 1, min(end_page, total_pages) - 1, 2)
+
+
+def match_setsu_to_moku(moku_ys: List[int], setsu_list: List[Dict]) -> List[List[Dict]]:
+    """
+    各目に対応する節を一度の走査で割り当てる
+    目 i の範囲は [y_i - 20, y_{i+1} - 20)。moku_ys と setsu_list はどちらもY座標順
+    """
+    matched = []
+    si = 0
+    n = len(setsu_list)
+    next_ys = moku_ys[1:] + [float('inf')]
+    for y, next_y in zip(moku_ys, next_ys):
+        # 範囲より上にある節はどの目にも属さない
+        while si < n and setsu_list[si]['y_start'] < y - 20:
+            si += 1
+        group = []
+        while si < n and setsu_list[si]['y_start'] < next_y - 20:
+            group.append(setsu_list[si])
+            si += 1
+        matched.append(group)
+    return matched
+
+
+def build_budget_structure(spreads: Iterable[Tuple[List[Tuple], List[Dict]]]) -> Dict:
+    """
+    解析済みの見開き（process_spread の結果）をページ順に受け取り予算構造を構築
+    """
+    result = {"款": []}
+
+    # 現在の款・項は (名称, データ) のタプルで保持する
+    current_kan = None
+    current_kou = None
 
-        for row in left_rows:
-            row_type, name, data = identify_row_type(row['left'])
+    for rows, right_setsu_list in spreads:
+        # 目の行のY座標から、目ごとの節を先にまとめて割り当てる
+        moku_ys = [y for y, row_type, _, _ in rows if row_type == 'moku']
+        moku_setsu = iter(match_setsu_to_moku(moku_ys, right_setsu_list))
 
+        for _, row_type, name, data in rows:
             if row_type == 'kan_header':
                 kan_name = name
-                if current_kan is None or list(current_kan.keys())[0] != kan_name:
+                if current_kan is None or current_kan[0] != kan_name:
                     if current_kan:
-                        result['款'].append(current_kan)
-                    current_kan = {
-                        kan_name: {
-                            '本年度予算額': data.get('本年度予算額'),
-                            '項': []
-                        }
-                    }
+                        result['款'].append({current_kan[0]: current_kan[1]})
+                    current_kan = (kan_name, {
+                        '本年度予算額': data.get('本年度予算額'),
+                        '項': []
+                    })
                     current_kou = None
 
             elif row_type == 'kou_header':
                 kou_name = name
                 if current_kan:
-                    kan_name = list(current_kan.keys())[0]
                     existing = None
-                    for k in current_kan[kan_name]['項']:
-                        if list(k.keys())[0] == kou_name:
-                            existing = k
+                    for k in current_kan[1]['項']:
+                        if kou_name in k:
+                            existing = (kou_name, k[kou_name])
                             break
 
                     if existing is None:
-                        current_kou = {
-                            kou_name: {
-                                '本年度予算額': data.get('本年度予算額'),
-                                '目': []
-                            }
-                        }
-                        current_kan[kan_name]['項'].append(current_kou)
+                        current_kou = (kou_name, {
+                            '本年度予算額': data.get('本年度予算額'),
+                            '目': []
+                        })
+                        current_kan[1]['項'].append({kou_name: current_kou[1]})
                     else:
                         current_kou = existing
 
             elif row_type == 'moku':
                 moku_name = name
+                matched_setsu = next(moku_setsu)
                 if current_kou:
-                    kou_name = list(current_kou.keys())[0]
-
                     moku_data = {
                         '本年度予算額': data.get('本年度予算額'),
                         '前年度予算額': data.get('前年度予算額'),
                         '比較': data.get('比較'),
                     }
 
-                    # 現在の目のY座標範囲を計算
-                    row_y = row['y']
-                    # 次の目のY座標を探す
-                    next_moku_y = float('inf')
-                    for mr in moku_rows:
-                        if mr['y'] > row_y:
-                            next_moku_y = mr['y']
-                            break
-
-                    # Y座標範囲内の節を全て収集
-                    matched_setsu = []
-                    remaining_setsu = []
-                    for setsu in right_setsu_list:
-                        if row_y - 20 <= setsu['y_start'] < next_moku_y - 20:
-                            matched_setsu.append(setsu)
-                        else:
-                            remaining_setsu.append(setsu)
-                    right_setsu_list = remaining_setsu
-
                     if matched_setsu:
                         moku_data['節'] = []
                         for s in matched_setsu:
@@ -363,10 +463,10 @@ def build_budget_structure(pdf, start_page: int, end_page: int) -> Dict:
                             moku_data['節'].append(setsu_entry)
 
                     moku_entry = {moku_name: moku_data}
-                    current_kou[kou_name]['目'].append(moku_entry)
+                    current_kou[1]['目'].append(moku_entry)
 
     if current_kan:
-        result['款'].append(current_kan)
+        result['款'].append({current_kan[0]: current_kan[1]})
 
     return result
 
@@ -374,32 +474,60 @@ def build_budget_structure(pdf, start_page: int, end_page: int) -> Dict:
 def main():
     import sys
 
-    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "bugget.pdf"
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    # --fast: extract_words() の代わりに page.chars から直接単語を組み立てる
+    # -p: 標準出力もインデント付きで出力する
+    fast = '--fast' in sys.argv[1:]
+    pretty = '-p' in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a not in ('--fast', '-p')]
+
+    pdf_path = args[0] if len(args) > 0 else "bugget.pdf"
+    output_path = args[1] if len(args) > 1 else None
 
     with pdfplumber.open(pdf_path) as pdf:
-        print(f"PDF: {pdf_path}", file=sys.stderr)
-        print(f"総ページ数: {len(pdf.pages)}", file=sys.stderr)
+        total_pages = len(pdf.pages)
+    print(f"PDF: {pdf_path}", file=sys.stderr)
+    print(f"総ページ数: {total_pages}", file=sys.stderr)
+
+    # 見開きごとのページ解析は互いに独立しているのでプロセス並列で行い、
+    # 款・項・目の状態管理は結果をページ順に受け取って直列で行う
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker,
+                             initargs=(pdf_path, fast)) as executor:
+        # 歳入・歳出の見開きを先にまとめて投入し、歳入の組み立て中も歳出のページ解析を進める
+        sainyuu_spreads = executor.map(
+            _process_spread, spread_indices(*SAINYUU_PAGES, total_pages), chunksize=4)
+        saishutsu_spreads = executor.map(
+            _process_spread, spread_indices(*SAISHUTSU_PAGES, total_pages), chunksize=4)
 
         print("歳入を抽出中...", file=sys.stderr)
-        sainyuu = build_budget_structure(pdf, SAINYUU_PAGES[0], SAINYUU_PAGES[1])
+        sainyuu = build_budget_structure(sainyuu_spreads)
         print(f"  歳入: {len(sainyuu['款'])}款", file=sys.stderr)
 
         print("歳出を抽出中...", file=sys.stderr)
-        saishutsu = build_budget_structure(pdf, SAISHUTSU_PAGES[0], SAISHUTSU_PAGES[1])
+        saishutsu = build_budget_structure(saishutsu_spreads)
         print(f"  歳出: {len(saishutsu['款'])}款", file=sys.stderr)
 
-        result = {
-            "歳入": sainyuu,
-            "歳出": saishutsu,
-        }
-
-        if output_path:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
-            print(f"出力: {output_path}", file=sys.stderr)
-        else:
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+    result = {
+        "歳入": sainyuu,
+        "歳出": saishutsu,
+    }
+
+    # ファイルはインデント付きで出力し、標準出力はパイプで渡す前提で詰めて出力する（-p で整形）
+    # orjson はインデント付きの整形もCで行う（json.dumps(ensure_ascii=False, indent=2) と同じ出力）
+    pretty = pretty or output_path is not None
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        output = orjson.dumps(result, option=option)
+    elif pretty:
+        output = json.dumps(result, ensure_ascii=False, indent=2).encode('utf-8')
+    else:
+        output = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(output)
+        print(f"出力: {output_path}", file=sys.stderr)
+    else:
+        sys.stdout.buffer.write(output + b'\n')
 
 
 if __name__ == "__main__":
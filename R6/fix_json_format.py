@@ -12,37 +12,65 @@ import json
 import sys
 import os
 
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
+
+
+# 名称として使うキー（先にあるものを優先）
+_NAME_KEYS = ("名称", "項名", "目名", "節名", "名", "名前", "name")
+
+# 変換後に取り除く番号・名称系のメタキー
+_META_KEYS = frozenset(["番号", "項番号", "目番号", "節番号", "コード", "code", "number",
+                        "名称", "項名", "目名", "節名", "名", "名前", "name"])
+
+# 金額キーの正規化表
+_AMOUNT_KEY_MAP = {
+    "budget": "本年度予算額",
+    "prev_budget": "前年度予算額",
+    "comparison": "比較",
+    "金額": "金額",
+    "予算額": "本年度予算額",
+}
+
+
+def load_json(filepath: str):
+    """JSONファイルを読み込む（orjson があれば使う）"""
+    if orjson:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump_json(data, filepath: str):
+    """JSONファイルを書き出す（インデント2、非ASCIIはそのまま）"""
+    if orjson:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
 
 def get_name(item: dict) -> str:
     """名称キーを探して値を返す"""
-    name_keys = ["名称", "項名", "目名", "節名", "名", "名前", "name"]
-    for key in name_keys:
-        if key in item and isinstance(item[key], str):
-            return item[key]
+    for key in _NAME_KEYS:
+        value = item.get(key)
+        if isinstance(value, str):
+            return value
     return None
 
 
 def remove_meta_keys(item: dict) -> dict:
     """番号系のメタキーを除去"""
-    meta_keys = ["番号", "項番号", "目番号", "節番号", "コード", "code", "number",
-                 "名称", "項名", "目名", "節名", "名", "名前", "name"]
-    return {k: v for k, v in item.items() if k not in meta_keys}
+    return {k: v for k, v in item.items() if k not in _META_KEYS}
 
 
 def normalize_amount_keys(item: dict) -> dict:
     """金額キーを正規化"""
-    key_mapping = {
-        "budget": "本年度予算額",
-        "prev_budget": "前年度予算額",
-        "comparison": "比較",
-        "金額": "金額",
-        "予算額": "本年度予算額",
-    }
-    result = {}
-    for k, v in item.items():
-        new_key = key_mapping.get(k, k)
-        result[new_key] = v
-    return result
+    return {_AMOUNT_KEY_MAP.get(k, k): v for k, v in item.items()}
 
 
 def convert_setsu(setsu: dict) -> dict:
@@ -169,16 +197,14 @@ def convert_kan(data: dict) -> dict:
 def fix_file(filepath: str) -> bool:
     """ファイルを修正"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_json(filepath)
 
         converted = convert_kan(data)
         if converted is None:
             print(f"✗ {filepath}: 変換失敗")
             return False
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(converted, f, ensure_ascii=False, indent=2)
+        dump_json(converted, filepath)
 
         print(f"✓ {filepath}: 変換完了")
         return True
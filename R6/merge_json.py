@@ -7,13 +7,22 @@
 """
 
 import json
-import glob
 import os
 import sys
 
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
+
+
 def load_json_file(filepath):
-    """JSONファイルを読み込む"""
+    """JSONファイルを読み込む（orjson があれば使う）"""
     try:
+        if orjson:
+            # バイト列のまま渡してデコードの往復を省く
+            with open(filepath, 'rb') as f:
+                return orjson.loads(f.read())
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
@@ -21,40 +30,53 @@ def load_json_file(filepath):
         return None
 
 
+# 単独で現れると不正な断片とみなすキー
+_SUSPECT_KEYS = frozenset(["名", "number", "目"])
+
+
 def is_valid_item(item):
     """有効な項目かどうかをチェック（不正なデータパターンを検出）"""
     if not isinstance(item, dict):
         return False
     # 明確に不正なキーパターンをチェック
     # 例: {"名": "ゴルフ場利用税交付金"} や {"number": "１"} や {"目": 1}
-    keys = list(item.keys())
     # 単一キーで値が文字列・整数で、かつ予算関連キーがない場合は不正
-    if len(keys) == 1:
-        key = keys[0]
-        val = item[key]
-        if key in ["名", "number", "目"] and isinstance(val, (str, int)):
-            return False
+    if len(item) != 1:
+        return True
+    key = next(iter(item))
+    if key in _SUSPECT_KEYS and isinstance(item[key], (str, int)):
+        return False
     return True
 
 
+# 英語キー → 日本語キー
+_KEY_MAPPING = {
+    "budget": "本年度予算額",
+    "prev_budget": "前年度予算額",
+    "comparison": "比較",
+    "mokuteki": "目",
+    "name": "名称",
+    "number": "番号",
+    "items": "項",
+    "targets": "目",
+    "code": "番号",
+}
+_ENGLISH_KEYS = frozenset(_KEY_MAPPING)
+
+# 名称として使うキー（先にあるものを優先）
+_NAME_KEYS = ("名称", "項名", "目名", "名", "名前")
+_SETSU_NAME_KEYS = ("節名", "名称", "名", "名前")
+
+# 変換後に取り除く番号キー
+_NUMBER_KEYS = ("番号", "款番号", "項番号", "目番号")
+
+
 def normalize_keys(item):
     """英語キーを日本語キーに変換"""
-    key_mapping = {
-        "budget": "本年度予算額",
-        "prev_budget": "前年度予算額",
-        "comparison": "比較",
-        "mokuteki": "目",
-        "name": "名称",
-        "number": "番号",
-        "items": "項",
-        "targets": "目",
-        "code": "番号",
-    }
-    result = {}
-    for k, v in item.items():
-        new_key = key_mapping.get(k, k)
-        result[new_key] = v
-    return result
+    # 英語キーがなければ作り直さずにそのまま返す（正規化済みの dict を再度渡しても安い）
+    if _ENGLISH_KEYS.isdisjoint(item):
+        return item
+    return {_KEY_MAPPING.get(k, k): v for k, v in item.items()}
 
 
 def convert_item(item, level="項"):
@@ -72,18 +94,12 @@ def convert_item(item, level="項"):
         item = normalize_keys(item)
 
         # 名称キーを探す（様々な形式に対応）
-        name = None
-        for name_key in ["名称", "項名", "目名", "名", "名前"]:
-            if name_key in item:
-                name = item.pop(name_key)
-                break
+        name = next((item.pop(k) for k in _NAME_KEYS if k in item), None)
 
         if name:
             # 番号も除去（必要に応じて）
-            item.pop("番号", None)
-            item.pop("款番号", None)
-            item.pop("項番号", None)
-            item.pop("目番号", None)
+            for k in _NUMBER_KEYS:
+                item.pop(k, None)
 
             # 下位階層を再帰的に変換（Noneをフィルタリング）
             if "項" in item and isinstance(item["項"], list):
@@ -121,16 +137,10 @@ def convert_setsu(setsu):
     setsu = normalize_keys(setsu)
 
     # 名称キーを探す（様々な形式に対応）
-    name = None
-    for name_key in ["節名", "名称", "名", "名前", "説明"]:
-        if name_key in setsu and isinstance(setsu[name_key], str):
-            # "説明"が金額と同居している場合は節名として使用
-            if name_key == "説明" and "金額" in setsu:
-                name = setsu.pop(name_key)
-                break
-            elif name_key != "説明":
-                name = setsu.pop(name_key)
-                break
+    name = next((setsu.pop(k) for k in _SETSU_NAME_KEYS if isinstance(setsu.get(k), str)), None)
+    # 名称がなく、"説明"が金額と同居している場合は節名として使用
+    if name is None and isinstance(setsu.get("説明"), str) and "金額" in setsu:
+        name = setsu.pop("説明")
 
     # "節"キーが番号文字列の場合は番号として扱い、削除
     if "節" in setsu and isinstance(setsu["節"], str) and setsu["節"].isdigit():
@@ -211,6 +221,13 @@ def convert_kan_format(data):
     return data
 
 
+def list_json_files(ocr_dir, prefix):
+    """ocr_dir 直下の {prefix}*.json をファイル名順に返す"""
+    with os.scandir(ocr_dir) as entries:
+        return sorted(e.path for e in entries
+                      if e.name.startswith(prefix) and e.name.endswith('.json') and e.is_file())
+
+
 def merge_budget_json(ocr_dir, output_file):
     """歳入・歳出のJSONを統合"""
 
@@ -220,7 +237,7 @@ def merge_budget_json(ocr_dir, output_file):
     }
 
     # 歳入JSONの読み込み（01〜22）
-    revenue_files = sorted(glob.glob(os.path.join(ocr_dir, "歳入_*.json")))
+    revenue_files = list_json_files(ocr_dir, "歳入_")
     for filepath in revenue_files:
         data = load_json_file(filepath)
         if data:
@@ -230,7 +247,7 @@ def merge_budget_json(ocr_dir, output_file):
                 print(f"歳入読み込み完了: {os.path.basename(filepath)}", file=sys.stderr)
 
     # 歳出JSONの読み込み（01〜14）
-    expense_files = sorted(glob.glob(os.path.join(ocr_dir, "歳出_*.json")))
+    expense_files = list_json_files(ocr_dir, "歳出_")
     for filepath in expense_files:
         data = load_json_file(filepath)
         if data:
@@ -240,8 +257,12 @@ def merge_budget_json(ocr_dir, output_file):
                 print(f"歳出読み込み完了: {os.path.basename(filepath)}", file=sys.stderr)
 
     # 統合JSONを出力
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    if orjson:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
 
     print(f"\n統合完了: {output_file}", file=sys.stderr)
     print(f"歳入: {len(result['歳入']['款'])}款", file=sys.stderr)
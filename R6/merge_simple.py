@@ -9,6 +9,31 @@ import json
 import glob
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
+
+
+def load_json(filepath):
+    """JSONファイルを読み込む（orjson があれば使う）"""
+    if orjson:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump_json(data, filepath):
+    """JSONファイルを書き出す（インデント2、非ASCIIはそのまま）"""
+    if orjson:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
 
 
 def main():
@@ -24,22 +49,25 @@ def main():
         "歳出": {"款": []}
     }
 
-    # 歳入
-    for filepath in sorted(glob.glob(os.path.join(ocr_dir, "歳入_*.json"))):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        result["歳入"]["款"].append(data)
-        print(f"歳入: {os.path.basename(filepath)}", file=sys.stderr)
-
-    # 歳出
-    for filepath in sorted(glob.glob(os.path.join(ocr_dir, "歳出_*.json"))):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        result["歳出"]["款"].append(data)
-        print(f"歳出: {os.path.basename(filepath)}", file=sys.stderr)
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    sainyuu_files = sorted(glob.glob(os.path.join(ocr_dir, "歳入_*.json")))
+    saishutsu_files = sorted(glob.glob(os.path.join(ocr_dir, "歳出_*.json")))
+
+    # 読み込みはI/O待ちが中心なのでスレッドで並列に行う（map なのでファイル順は保たれる）
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        sainyuu_data = executor.map(load_json, sainyuu_files)
+        saishutsu_data = executor.map(load_json, saishutsu_files)
+
+        # 歳入
+        for filepath, data in zip(sainyuu_files, sainyuu_data):
+            result["歳入"]["款"].append(data)
+            print(f"歳入: {os.path.basename(filepath)}", file=sys.stderr)
+
+        # 歳出
+        for filepath, data in zip(saishutsu_files, saishutsu_data):
+            result["歳出"]["款"].append(data)
+            print(f"歳出: {os.path.basename(filepath)}", file=sys.stderr)
+
+    dump_json(result, output_file)
 
     print(f"\n統合完了: {output_file}", file=sys.stderr)
     print(f"歳入: {len(result['歳入']['款'])}款", file=sys.stderr)
@@ -39,25 +39,69 @@
 4. 金額は整数（千円単位 or 円単位）
 """
 
+import hashlib
 import json
+import os
 import sys
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Set
 
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
 
-def validate_named_item(item: dict, level: str, path: str) -> Tuple[bool, List[str]]:
+
+# 合格したファイル内容のハッシュを保存するキャッシュ
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "validate_json.json")
+
+
+def validator_digest() -> str:
+    """このスクリプト自身のハッシュ（検証ルールが変わったらキャッシュを無効にする）"""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_cache(validator: str) -> Set[str]:
+    """前回までに合格したファイル内容のハッシュを読み込む"""
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    # 壊れたキャッシュ（想定外の型）は無視する
+    if not isinstance(cache, dict) or cache.get("validator") != validator:
+        return set()
+    valid = cache.get("valid")
+    if not isinstance(valid, list):
+        return set()
+    return {digest for digest in valid if isinstance(digest, str)}
+
+
+def save_cache(validator: str, valid: Set[str]):
+    """合格したファイル内容のハッシュを保存する（書けなくても検証結果には影響しない）"""
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"validator": validator, "valid": sorted(valid)}, f)
+    except OSError:
+        pass
+
+
+def validate_named_item(item: dict, level: str, path: str
+                        ) -> Tuple[bool, List[str], Optional[str], Optional[dict]]:
     """
     {名称: データ} 形式の項目をバリデート
-    Returns: (is_valid, error_messages)
+    Returns: (is_valid, error_messages, name, data)
     """
     errors = []
 
     if not isinstance(item, dict):
-        return False, [f"{path}: 辞書ではない ({type(item).__name__})"]
+        return False, [f"{path}: 辞書ではない ({type(item).__name__})"], None, None
 
     if len(item) != 1:
-        return False, [f"{path}: 単一キーではない (keys: {list(item.keys())})"]
+        return False, [f"{path}: 単一キーではない (keys: {list(item.keys())})"], None, None
 
-    name = list(item.keys())[0]
+    name = next(iter(item))
     data = item[name]
 
     if not isinstance(name, str):
@@ -65,9 +109,9 @@ def validate_named_item(item: dict, level: str, path: str) -> Tuple[bool, List[s
 
     if not isinstance(data, dict):
         errors.append(f"{path}/{name}: データが辞書ではない ({type(data).__name__})")
-        return False, errors
+        return False, errors, name, data
 
-    return True, errors
+    return True, errors, name, data
 
 
 def validate_amount(value, field: str, path: str, required: bool = True) -> List[str]:
@@ -85,14 +129,11 @@ def validate_setsu(setsu: dict, path: str) -> List[str]:
     """節をバリデート"""
     errors = []
 
-    valid, item_errors = validate_named_item(setsu, "節", path)
+    valid, item_errors, name, data = validate_named_item(setsu, "節", path)
     errors.extend(item_errors)
     if not valid:
         return errors
 
-    name = list(setsu.keys())[0]
-    data = setsu[name]
-
     # 金額は必須
     errors.extend(validate_amount(data, "金額", f"{path}/{name}"))
 
@@ -103,14 +144,11 @@ def validate_moku(moku: dict, path: str) -> List[str]:
     """目をバリデート"""
     errors = []
 
-    valid, item_errors = validate_named_item(moku, "目", path)
+    valid, item_errors, name, data = validate_named_item(moku, "目", path)
     errors.extend(item_errors)
     if not valid:
         return errors
 
-    name = list(moku.keys())[0]
-    data = moku[name]
-
     # 金額フィールド（オプション - 元データにない場合がある）
     errors.extend(validate_amount(data, "本年度予算額", f"{path}/{name}", required=False))
     errors.extend(validate_amount(data, "前年度予算額", f"{path}/{name}", required=False))
@@ -131,14 +169,11 @@ def validate_kou(kou: dict, path: str) -> List[str]:
     """項をバリデート"""
     errors = []
 
-    valid, item_errors = validate_named_item(kou, "項", path)
+    valid, item_errors, name, data = validate_named_item(kou, "項", path)
     errors.extend(item_errors)
     if not valid:
         return errors
 
-    name = list(kou.keys())[0]
-    data = kou[name]
-
     # 金額フィールド（オプション - 元データにない場合がある）
     errors.extend(validate_amount(data, "本年度予算額", f"{path}/{name}", required=False))
     errors.extend(validate_amount(data, "前年度予算額", f"{path}/{name}", required=False))
@@ -165,7 +200,7 @@ def validate_kan(data: dict, filename: str) -> List[str]:
     if len(data) != 1:
         return [f"{filename}: ルートが単一キーではない (keys: {list(data.keys())})"]
 
-    kan_name = list(data.keys())[0]
+    kan_name = next(iter(data))
     kan_data = data[kan_name]
 
     if not isinstance(kan_data, dict):
@@ -188,26 +223,51 @@ def validate_kan(data: dict, filename: str) -> List[str]:
     return errors
 
 
-def validate_file(filepath: str) -> Tuple[bool, List[str]]:
-    """JSONファイルをバリデート"""
+def validate_file(filepath: str, valid_cache: Optional[Set[str]] = None) -> Tuple[bool, List[str]]:
+    """
+    JSONファイルをバリデート
+
+    valid_cache を渡した場合、合格済みの内容（SHA-256）なら検証を省略し、
+    新たに合格したファイルのハッシュを追加する
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if valid_cache is not None and digest in valid_cache:
+            return True, []
+
+        if orjson:
+            data = orjson.loads(raw)
+        else:
+            data = json.loads(raw.decode('utf-8'))
     except Exception as e:
         return False, [f"ファイル読み込みエラー: {e}"]
 
     errors = validate_kan(data, filepath)
+    if not errors and valid_cache is not None:
+        valid_cache.add(digest)
     return len(errors) == 0, errors
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("使い方: python3 validate_json.py <json_file> [json_file2 ...]")
+    # --no-cache: 合格済みキャッシュを使わずに全ファイルを検証する
+    use_cache = '--no-cache' not in sys.argv[1:]
+    filepaths = [a for a in sys.argv[1:] if a != '--no-cache']
+
+    if not filepaths:
+        print("使い方: python3 validate_json.py [--no-cache] <json_file> [json_file2 ...]")
         sys.exit(1)
 
+    valid_cache = None
+    if use_cache:
+        validator = validator_digest()
+        valid_cache = load_cache(validator)
+        cached_count = len(valid_cache)
+
     total_errors = 0
-    for filepath in sys.argv[1:]:
-        is_valid, errors = validate_file(filepath)
+    for filepath in filepaths:
+        is_valid, errors = validate_file(filepath, valid_cache)
         if is_valid:
             print(f"✓ {filepath}")
         else:
@@ -218,6 +278,9 @@ def main():
                 print(f"  ... 他 {len(errors) - 10} 件のエラー")
             total_errors += len(errors)
 
+    if use_cache and len(valid_cache) != cached_count:
+        save_cache(validator, valid_cache)
+
     sys.exit(0 if total_errors == 0 else 1)
 
 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+予算書処理スクリプトの共通処理
+
+split_budget_by_section.py / pdf_to_text.py / ocr_to_json_by_section.py から使う
+"""
+
+import json
+import os
+from pathlib import Path
+
+# ファイル名に使えない文字の置換表
+_SAFE_NAME_TABLE = str.maketrans({"/": "・", "\\": "・"})
+
+
+def safe_file_name(section_key: str) -> str:
+    """セクションキーをファイル名に使える形にする（/ と \\ を「・」に置換）"""
+    return section_key.translate(_SAFE_NAME_TABLE)
+
+
+def input_fingerprint(path: Path) -> list[int]:
+    """入力ファイルの指紋（更新時刻とサイズ）を返す"""
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_up_to_date_summary(summary_path: Path, fingerprint: list[int]) -> dict | None:
+    """
+    前回の _summary.json が同じ入力（指紋が一致）から作られていれば、その内容を返す
+
+    Returns:
+        サマリーの辞書。ファイルがない・壊れている・指紋が違う場合は None
+    """
+    try:
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(summary, dict) or summary.get("fingerprint") != fingerprint:
+        return None
+    return summary
+
+
+def default_workers() -> int:
+    """
+    並行処理のデフォルトワーカー数を返す
+    処理の大半は ghostscript の子プロセス待ちなので、利用可能なCPUコア数の2倍とする
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 4
+    return cores * 2
+
+
+def gs_txtwrite_command(pdf_path: Path, output_file: str = "-",
+                        first_page: int | None = None, last_page: int | None = None) -> list[str]:
+    """
+    ghostscriptでPDFからテキストを抽出するコマンドを組み立てる
+
+    Args:
+        pdf_path: PDFファイルのパス
+        output_file: 出力先（"-" で標準出力、%d を含めるとページごとに別ファイル）
+        first_page, last_page: 抽出するページ範囲（省略時は全ページ）
+    """
+    command = ["gs", "-q", "-dNOPAUSE", "-dBATCH", "-dSAFER", "-sDEVICE=txtwrite"]
+    if first_page is not None:
+        command.append(f"-dFirstPage={first_page}")
+    if last_page is not None:
+        command.append(f"-dLastPage={last_page}")
+    command += [f"-sOutputFile={output_file}", str(pdf_path)]
+    return command
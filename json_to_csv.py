@@ -12,6 +12,12 @@
 import json
 import csv
 import sys
+from itertools import count
+
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
 
 
 def extract_name_and_data(obj):
@@ -25,8 +31,8 @@ def is_sub_item(value):
     return isinstance(value, dict) and "金額" in value
 
 
-def process_setsumei(setsumei, rows):
-    """説明を処理。子項目があれば説明行を追加。"""
+def process_setsumei(setsumei):
+    """説明を処理。子項目があれば説明行を返す。"""
     for key, val in setsumei.items():
         if is_sub_item(val):
             # 子項目: {"均等割": {"金額": 403000, "調定見込額": "..."}}
@@ -36,7 +42,7 @@ def process_setsumei(setsumei, rows):
                 desc = f"{key}（{note}）"
             else:
                 desc = key
-            rows.append(["", "", "", "", desc, "", val["金額"]])
+            yield ["", "", "", "", desc, "", val["金額"]]
         # 文字列値（調定見込額等）は節行に含めるので、ここではスキップ
 
 
@@ -61,8 +67,7 @@ def has_named_sub_items(setsumei):
 
 
 def convert(data):
-    rows = []
-
+    """JSONを款・項・目・節の順にCSV行へ変換（1行ずつ返す）"""
     for section_key in ["歳入", "歳出"]:
         section = data.get(section_key)
         if not section:
@@ -72,27 +77,27 @@ def convert(data):
 
         for kan_obj in kan_list:
             kan_name, kan_data = extract_name_and_data(kan_obj)
-            rows.append([
+            yield [
                 kan_name, "", "", "", "",
                 kan_data.get("前年度予算額", ""),
                 kan_data.get("本年度予算額", ""),
-            ])
+            ]
 
             for kou_obj in kan_data.get("項", []):
                 kou_name, kou_data = extract_name_and_data(kou_obj)
-                rows.append([
+                yield [
                     "", kou_name, "", "", "",
                     kou_data.get("前年度予算額", ""),
                     kou_data.get("本年度予算額", ""),
-                ])
+                ]
 
                 for moku_obj in kou_data.get("目", []):
                     moku_name, moku_data = extract_name_and_data(moku_obj)
-                    rows.append([
+                    yield [
                         "", "", moku_name, "", "",
                         moku_data.get("前年度予算額", ""),
                         moku_data.get("本年度予算額", ""),
-                    ])
+                    ]
 
                     for setsu_obj in moku_data.get("節", []):
                         setsu_name, setsu_data = extract_name_and_data(setsu_obj)
@@ -101,13 +106,12 @@ def convert(data):
 
                         if has_named_sub_items(setsumei):
                             # 子項目あり → 節行 + 説明行
-                            rows.append(["", "", "", setsu_name, "", "", amount])
-                            process_setsumei(setsumei, rows)
+                            yield ["", "", "", setsu_name, "", "", amount]
+                            yield from process_setsumei(setsumei)
                         else:
                             # 子項目なし → 節行に備考を入れる
                             notes = flat_notes(setsumei)
-                            rows.append(["", "", "", setsu_name, notes, "", amount])
-    return rows
+                            yield ["", "", "", setsu_name, notes, "", amount]
 
 
 def main():
@@ -115,10 +119,12 @@ def main():
         print("使い方: python3 json2csv.py input.json [output.csv]")
         sys.exit(1)
 
-    with open(sys.argv[1], encoding="utf-8") as f:
-        data = json.load(f)
-
-    rows = convert(data)
+    if orjson:
+        with open(sys.argv[1], "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            data = json.load(f)
 
     if len(sys.argv) >= 3:
         out = open(sys.argv[2], "w", encoding="utf-8", newline="")
@@ -127,12 +133,15 @@ def main():
 
     writer = csv.writer(out, lineterminator="\n")
     writer.writerow(["款", "項", "目", "節", "説明", "R6", "R7"])
-    for row in rows:
-        writer.writerow(row)
+
+    # 行リストを作らずに書き出す。counter は zip で行と一緒に進むので、最後の値が行数になる
+    counter = count()
+    writer.writerows(row for row, _ in zip(convert(data), counter))
+    row_count = next(counter)
 
     if out is not sys.stdout:
         out.close()
-        print(f"出力: {sys.argv[2]} ({len(rows)}行)", file=sys.stderr)
+        print(f"出力: {sys.argv[2]} ({row_count}行)", file=sys.stderr)
 
 
 if __name__ == "__main__":
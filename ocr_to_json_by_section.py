@@ -3,7 +3,9 @@
 OCRファイルを「款」セクションごとにJSONファイルに分割するスクリプト
 
 使用方法:
-    python ocr_to_json_by_section.py <ocr_file> [output_dir]
+    python ocr_to_json_by_section.py <ocr_file> [output_dir] [--force]
+
+    OCRファイルが前回から変わっていなければ何もしない（--force で常に作り直す）
 
 例:
     python ocr_to_json_by_section.py 8年度予算/bugget.pdf_ocr 8年度予算/json
@@ -14,6 +16,37 @@ import re
 import sys
 from pathlib import Path
 
+from budget_utils import input_fingerprint, load_up_to_date_summary, safe_file_name
+
+try:
+    import orjson
+except ImportError:  # orjson がなければ標準の json を使う
+    orjson = None
+
+# json.dump は細かい単位で write するので、大きめのバッファでまとめて書き出す
+_WRITE_BUFFER_SIZE = 1 << 20
+# OCRファイルの読み込みバッファ
+_READ_BUFFER_SIZE = 1 << 20
+
+# 行番号付きの行「  12→テキスト」
+_LINE_RE = re.compile(r'\s*\d+→(.*)$')
+# ページ区切り「- N -」
+_PAGE_RE = re.compile(r'^-\s*(\d+)\s*-$')
+# 款の見出し「１款 市税」
+_KAN_RE = re.compile(r'([１-９０][０-９]?|[0-9]{1,2})款\s+([^\s\d０-９千円]+)')
+# 款名の末尾に付く不要な文字
+_TRAILER_RE = re.compile(r'[項金額]$')
+
+
+def dump_json(data, output_path: Path):
+    """JSONファイルを書き出す（インデント2、非ASCIIはそのまま）"""
+    if orjson:
+        with open(output_path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(output_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
 
 def parse_ocr_file(ocr_path: Path) -> dict[int, list[str]]:
     """
@@ -22,31 +55,40 @@ def parse_ocr_file(ocr_path: Path) -> dict[int, list[str]]:
     Returns:
         dict: {ページ番号(1-indexed): [そのページの行リスト]}
     """
-    with open(ocr_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
     pages = {}
     current_page = 0
     current_lines = []
 
-    for line in content.split("\n"):
-        # 行番号を除去してテキストを取得
-        match = re.match(r'\s*\d+→(.*)$', line)
-        if match:
-            text = match.group(1)
-        else:
-            text = line
+    match_line = _LINE_RE.match
+    match_page = _PAGE_RE.match
 
-        # ページ区切りを検出 「- N -」形式
-        page_match = re.search(r'^-\s*(\d+)\s*-$', text.strip())
-        if page_match:
-            # 前のページのデータを保存
-            if current_page > 0:
-                pages[current_page] = current_lines
-            current_page = int(page_match.group(1))
-            current_lines = []
-        else:
-            current_lines.append(text)
+    # ファイル全体を読み込まず、1行ずつ処理する
+    with open(ocr_path, "r", encoding="utf-8", buffering=_READ_BUFFER_SIZE) as f:
+        raw_line = ""
+        for raw_line in f:
+            line = raw_line[:-1] if raw_line.endswith("\n") else raw_line
+
+            # 行番号を除去してテキストを取得（「→」を含まない行は正規表現を実行しない）
+            text = line
+            if "→" in line:
+                match = match_line(line)
+                if match:
+                    text = match.group(1)
+
+            # ページ区切りを検出 「- N -」形式
+            page_match = match_page(text.strip())
+            if page_match:
+                # 前のページのデータを保存
+                if current_page > 0:
+                    pages[current_page] = current_lines
+                current_page = int(page_match.group(1))
+                current_lines = []
+            else:
+                current_lines.append(text)
+
+    # 改行で終わるファイル（または空のファイル）は、最後の改行の後に空行が1つあるものとして扱う
+    if not raw_line or raw_line.endswith("\n"):
+        current_lines.append("")
 
     # 最後のページを保存
     if current_page > 0:
@@ -62,31 +104,34 @@ def extract_section_from_lines(lines: list[str]) -> tuple[str | None, str | None
     Returns:
         (section_type, section_name): ("歳入"/"歳出", "01款_市税"など)
     """
-    text = "\n".join(lines)
-
-    # 歳入/歳出の判定
     section_type = None
-    if "歳 入" in text or "歳入" in text:
-        section_type = "歳入"
-    if "歳 出" in text or "歳出" in text:
-        section_type = "歳出"
-
-    # 款情報の抽出
     section_name = None
-    pattern = r'([１-９０][０-９]?|[0-9]{1,2})款\s+([^\s\d０-９千円]+)'
+    kan_search = _KAN_RE.search
 
+    # 行ごとに1回だけ走査する
     for line in lines:
-        match = re.search(pattern, line)
-        if match:
-            num = match.group(1)
-            # 全角数字を半角に変換
-            num = num.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
-            name = match.group(2).strip()
-            # 不要な文字を除去
-            name = re.sub(r'[項金額]$', '', name)
-            if name:
-                section_name = f"{int(num):02d}款_{name}"
-                break
+        # 歳入/歳出の判定（歳出がページ内にあれば歳出を優先）
+        if section_type != "歳出" and "歳" in line:
+            if "歳 出" in line or "歳出" in line:
+                section_type = "歳出"
+            elif "歳 入" in line or "歳入" in line:
+                section_type = "歳入"
+
+        # 款情報の抽出（「款」を含まない行は正規表現を実行しない）
+        if section_name is None and "款" in line:
+            match = kan_search(line)
+            if match:
+                # int() は全角数字もそのまま解釈できる
+                num = int(match.group(1))
+                name = match.group(2).strip()
+                # 不要な文字を除去
+                name = _TRAILER_RE.sub('', name)
+                if name:
+                    section_name = f"{num:02d}款_{name}"
+
+        # 両方確定したらそれ以上読む必要はない
+        if section_name is not None and section_type == "歳出":
+            break
 
     return section_type, section_name
 
@@ -141,13 +186,14 @@ def group_pages_by_section(pages: dict[int, list[str]]) -> dict[str, dict]:
     return sections
 
 
-def convert_ocr_to_json(ocr_path: str, output_dir: str = None) -> dict:
+def convert_ocr_to_json(ocr_path: str, output_dir: str = None, force: bool = False) -> dict:
     """
     OCRファイルを款セクションごとにJSONファイルに分割する
 
     Args:
         ocr_path: OCRファイルのパス
         output_dir: 出力ディレクトリ
+        force: Trueなら、OCRファイルが前回から変わっていなくても作り直す
 
     Returns:
         作成されたファイルの情報
@@ -165,6 +211,21 @@ def convert_ocr_to_json(ocr_path: str, output_dir: str = None) -> dict:
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # OCRファイルが前回から変わっておらず、出力もすべて残っていれば何もしない
+    fingerprint = input_fingerprint(ocr_path)
+    summary_path = output_dir / "_summary.json"
+    if not force:
+        summary = load_up_to_date_summary(summary_path, fingerprint)
+        if summary is not None:
+            results = {
+                section["key"]: str(output_dir / f"{safe_file_name(section['key'])}.json")
+                for section in summary["sections"]
+            }
+            if all(Path(path).exists() for path in results.values()):
+                print(f"OCRファイルに変更がないため処理をスキップしました: {ocr_path}")
+                print(f"サマリー: {summary_path}")
+                return results
+
     # OCRファイルを解析
     print(f"OCRファイル解析中: {ocr_path}")
     pages = parse_ocr_file(ocr_path)
@@ -177,62 +238,64 @@ def convert_ocr_to_json(ocr_path: str, output_dir: str = None) -> dict:
     # 各セクションをJSONファイルとして保存
     print("\nJSONファイルを作成中...")
     results = {}
+    summary_sections = []
 
     for section_key, section_data in sorted(sections.items()):
         # ファイル名を生成
-        safe_name = section_key.replace("/", "・").replace("\\", "・")
+        safe_name = safe_file_name(section_key)
         output_path = output_dir / f"{safe_name}.json"
 
+        # ページはページ番号の昇順で追加済みなので、先頭と末尾が開始・終了ページ
+        section_pages = section_data["pages"]
+        page_numbers = list(section_pages)
+        start_page = page_numbers[0]
+        end_page = page_numbers[-1]
+        page_count = len(page_numbers)
+
         # ページデータを整形
         json_data = {
             "section_key": section_key,
             "type": section_data["type"],
             "section": section_data["section"],
-            "page_count": len(section_data["pages"]),
+            "page_count": page_count,
             "page_range": {
-                "start": min(section_data["pages"].keys()),
-                "end": max(section_data["pages"].keys())
+                "start": start_page,
+                "end": end_page
             },
             "pages": [
                 {
                     "page_number": page_num,
                     "lines": lines
                 }
-                for page_num, lines in sorted(section_data["pages"].items())
+                for page_num, lines in section_pages.items()
             ]
         }
 
         # JSONファイルとして保存
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        dump_json(json_data, output_path)
 
-        page_count = len(section_data["pages"])
-        start_page = min(section_data["pages"].keys())
-        end_page = max(section_data["pages"].keys())
         print(f"  {safe_name}: ページ {start_page}-{end_page} ({page_count}ページ) -> {output_path.name}")
         results[section_key] = str(output_path)
 
+        summary_sections.append({
+            "key": section_key,
+            "type": section_data["type"],
+            "section": section_data["section"],
+            "page_count": page_count,
+            "page_range": [start_page, end_page],
+            "file": f"{section_key}.json"
+        })
+
     # サマリーファイルを作成
     summary = {
         "source_file": str(ocr_path),
+        "fingerprint": fingerprint,
         "total_pages": len(pages),
         "total_sections": len(sections),
-        "sections": [
-            {
-                "key": key,
-                "type": data["type"],
-                "section": data["section"],
-                "page_count": len(data["pages"]),
-                "page_range": [min(data["pages"].keys()), max(data["pages"].keys())],
-                "file": f"{key}.json"
-            }
-            for key, data in sorted(sections.items())
-        ]
+        "sections": summary_sections
     }
 
-    summary_path = output_dir / "_summary.json"
-    with open(summary_path, "w", encoding="utf-8") as f:
-        json.dump(summary, f, ensure_ascii=False, indent=2)
+    dump_json(summary, summary_path)
 
     print(f"\n完了: {len(results)} ファイルを {output_dir} に保存しました")
     print(f"サマリー: {summary_path}")
@@ -241,14 +304,17 @@ def convert_ocr_to_json(ocr_path: str, output_dir: str = None) -> dict:
 
 
 def main():
-    if len(sys.argv) < 2:
+    force = "--force" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+
+    if len(args) < 1:
         print(__doc__)
         sys.exit(1)
 
-    ocr_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    ocr_path = args[0]
+    output_dir = args[1] if len(args) > 1 else None
 
-    convert_ocr_to_json(ocr_path, output_dir)
+    convert_ocr_to_json(ocr_path, output_dir, force)
 
 
 if __name__ == "__main__":
@@ -18,6 +18,8 @@ import sys
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from budget_utils import default_workers, gs_txtwrite_command
+
 
 def pdf_to_text(pdf_path: Path) -> tuple[Path, str, bool]:
     """
@@ -30,12 +32,10 @@ def pdf_to_text(pdf_path: Path) -> tuple[Path, str, bool]:
         (pdf_path, text or error_message, success)
     """
     try:
-        result = subprocess.run([
-            "gs", "-q", "-dNOPAUSE", "-dBATCH", "-dSAFER",
-            "-sDEVICE=txtwrite",
-            "-sOutputFile=-",
-            str(pdf_path)
-        ], capture_output=True, text=True, timeout=300)
+        result = subprocess.run(
+            gs_txtwrite_command(pdf_path),
+            capture_output=True, text=True, timeout=300
+        )
 
         if result.returncode == 0:
             return (pdf_path, result.stdout, True)
@@ -67,13 +67,13 @@ def process_single_pdf(pdf_path: Path) -> tuple[Path, bool]:
         return (txt_path, False)
 
 
-def process_directory(dir_path: Path, workers: int = 4) -> dict:
+def process_directory(dir_path: Path, workers: int | None = None) -> dict:
     """
     ディレクトリ内の全PDFを並行処理
 
     Args:
         dir_path: ディレクトリパス
-        workers: 並行ワーカー数
+        workers: 並行ワーカー数（省略時はCPUコア数の2倍）
 
     Returns:
         結果の辞書
@@ -84,6 +84,10 @@ def process_directory(dir_path: Path, workers: int = 4) -> dict:
         print(f"PDFファイルが見つかりません: {dir_path}")
         return {}
 
+    if workers is None:
+        workers = default_workers()
+    workers = min(workers, len(pdf_files))
+
     print(f"処理対象: {len(pdf_files)} ファイル")
     print(f"並行ワーカー数: {workers}")
 
@@ -114,7 +118,7 @@ def main():
 
     parser = argparse.ArgumentParser(description="PDFからテキストを抽出")
     parser.add_argument("path", help="PDFファイルまたはディレクトリのパス")
-    parser.add_argument("--workers", "-w", type=int, default=4, help="並行ワーカー数（デフォルト: 4）")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="並行ワーカー数（デフォルト: CPUコア数の2倍）")
 
     args = parser.parse_args()
     path = Path(args.path)
@@ -13,23 +13,130 @@ ghostscriptでPDFを分割・修復します。
     python split_budget_by_section.py 8年度予算/repaired.pdf 8年度予算/分割
     python split_budget_by_section.py 8年度予算/repaired.pdf 8年度予算/分割 --workers 8
 
+    入力PDFが前回から変わっていなければ何もしない（--force で常に作り直す）
+
 必要条件:
     - ghostscript (gs) コマンドがインストールされていること
     - brew install ghostscript
+    - pikepdf がインストールされていれば、PDF分割はページのコピーで行う（高速）
+      pip install pikepdf
 """
 
 import argparse
+import asyncio
+import json
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from budget_utils import (
+    default_workers, gs_txtwrite_command, input_fingerprint, load_up_to_date_summary, safe_file_name,
+)
+
+try:
+    import pikepdf
+except ImportError:  # pikepdf がなければ ghostscript で分割する
+    pikepdf = None
+
+# 款の見出し「１款 市税」（\S は全角スペースも除くので、款名は最初の単語だけになる）
+_KAN_PDF_RE = re.compile(r'([１-９][０-９]?|[0-9]{1,2})款\s*(\S+)')
+
+
+def dump_all_pages(pdf_path: Path) -> list[str]:
+    """
+    ghostscriptでPDF全体を1回でテキスト化し、ページごとのテキストを返す
+
+    Returns:
+        list: [1ページ目のテキスト, 2ページ目のテキスト, ...]
+              ghostscriptが失敗した場合（途中で止まった場合を含む）は空リスト
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        # 出力ファイル名に %d を含めるとページごとに別ファイルになる
+        try:
+            result = subprocess.run(
+                gs_txtwrite_command(pdf_path, tmpdir / "page_%05d.txt"),
+                capture_output=True, timeout=600
+            )
+        except subprocess.TimeoutExpired:
+            return []
+
+        # 途中のページまでしか書き出されていない可能性があるので使わない
+        if result.returncode != 0:
+            return []
+
+        return [
+            path.read_text(encoding="utf-8", errors="replace")
+            for path in sorted(tmpdir.glob("page_*.txt"))
+        ]
+
+
+async def _extract_page_text(pdf_path: Path, page: int, semaphore: asyncio.Semaphore) -> str:
+    """ghostscriptで1ページ分のテキストを抽出する（同時実行数は semaphore で制限）"""
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(
+            *gs_txtwrite_command(pdf_path, first_page=page, last_page=page),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return ""
+
+    return stdout.decode("utf-8", errors="replace")
+
+
+async def _extract_pages_async(pdf_path: Path, total_pages: int, workers: int) -> list[str]:
+    """全ページのghostscriptを最大 workers 個まで同時に実行する"""
+    semaphore = asyncio.Semaphore(workers)
+    # gather は渡した順に結果を返すのでページ順が保たれる
+    return await asyncio.gather(*(
+        _extract_page_text(pdf_path, page, semaphore) for page in range(1, total_pages + 1)
+    ))
+
+
+def extract_pages_parallel(pdf_path: Path, total_pages: int, workers: int = 4) -> list[str]:
+    """
+    ページごとにghostscriptを並行実行してテキストを抽出する
+    （一括抽出に失敗した場合のフォールバック）
+
+    Returns:
+        list: [1ページ目のテキスト, 2ページ目のテキスト, ...]
+    """
+    return asyncio.run(_extract_pages_async(pdf_path, total_pages, workers))
+
+
+def load_pages_text(pdf_path: Path, workers: int = 4) -> list[str]:
+    """
+    PDFのページごとのテキストを取得する
+    （ghostscriptはPDF全体に対して1回だけ実行し、失敗した場合はページごとに並行実行する）
+
+    Returns:
+        list: [1ページ目のテキスト, 2ページ目のテキスト, ...]
+    """
+    # ページ数はPDFそのものから取得し、一括抽出の結果が欠けていないか確認する
+    total_pages = get_pdf_page_count(pdf_path)
+
+    pages_text = dump_all_pages(pdf_path)
+    if not pages_text:
+        print(f"  一括抽出に失敗したため、ページごとに抽出します（同時実行数: {workers}）")
+        pages_text = extract_pages_parallel(pdf_path, total_pages, workers)
+    elif len(pages_text) != total_pages:
+        print(f"  警告: 一括抽出のページ数（{len(pages_text)}）がPDFのページ数（{total_pages}）と一致しないため、"
+              f"ページごとに抽出します（同時実行数: {workers}）")
+        pages_text = extract_pages_parallel(pdf_path, total_pages, workers)
+    return pages_text
+
 
-def detect_kan_from_pdf(pdf_path: Path, total_pages: int) -> tuple[list[tuple[int, str, int, str]], int]:
+def detect_kan_from_pdf(pages_text: list[str]) -> tuple[list[tuple[int, str, int, str]], int]:
     """
-    PDFから直接款の位置を検出する
+    PDFから抽出したページごとのテキストから款の位置を検出する
 
     Returns:
         (list of (page_num, section_type, kan_num, kan_name), last_kan_page)
@@ -42,24 +149,18 @@ def detect_kan_from_pdf(pdf_path: Path, total_pages: int) -> tuple[list[tuple[in
     prev_kan = 0
     last_kan_page = 0  # 款が最後に出現したページ
 
-    for page in range(1, total_pages + 1):
-        result = subprocess.run([
-            "gs", "-q", "-dNOPAUSE", "-dBATCH", "-sDEVICE=txtwrite",
-            f"-dFirstPage={page}", f"-dLastPage={page}",
-            "-sOutputFile=-",
-            str(pdf_path)
-        ], capture_output=True, text=True, timeout=10)
-
-        text = result.stdout if result.stdout else ""
+    for page, text in enumerate(pages_text, start=1):
+        # 「款」を含まないページは正規表現を実行しない
+        if "款" not in text:
+            continue
 
         # 款を検出
-        matches = re.findall(r'([１-９][０-９]?|[0-9]{1,2})款\s*(\S+)', text)
+        matches = _KAN_PDF_RE.findall(text)
         if matches:
             last_kan_page = page  # 款が出現したページを記録
 
         for num_str, name in matches:
-            num = int(num_str.translate(str.maketrans('０１２３４５６７８９', '0123456789')))
-            name = re.sub(r'[　\s].*', '', name)  # 最初の単語だけ
+            num = int(num_str)  # int() は全角数字もそのまま解釈できる
 
             # 歳出判定（款番号が大きい数から1に戻ったら）
             if prev_kan >= 20 and num == 1:
@@ -71,9 +172,6 @@ def detect_kan_from_pdf(pdf_path: Path, total_pages: int) -> tuple[list[tuple[in
 
             prev_kan = num
 
-        if page % 50 == 0:
-            print(f"  {page}/{total_pages} ページ処理済み")
-
     # 遷移リストに変換
     transitions = []
     for (section_type, kan_num), (page, name) in sorted(kan_pages.items(), key=lambda x: (x[0][0], x[0][1])):
@@ -172,63 +270,35 @@ def split_pdf_with_gs(input_path: Path, output_path: Path, first_page: int, last
     return output_path.exists()
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """PDFからテキストを抽出する"""
-    result = subprocess.run([
-        "gs", "-q", "-dNOPAUSE", "-dBATCH", "-dSAFER",
-        "-sDEVICE=txtwrite",
-        "-sOutputFile=-",
-        str(pdf_path)
-    ], capture_output=True, text=True, timeout=300)
-
-    return result.stdout if result.returncode == 0 else ""
-
-
-def process_section(args: tuple) -> tuple[str, bool, str]:
+def split_pdf_with_pikepdf(pdf, output_path: Path, first_page: int, last_page: int) -> bool:
     """
-    1つのセクションを処理（PDF分割 + テキスト抽出）
-    並行処理用の関数
+    pikepdfでページをコピーしてPDFを分割（再描画しないので高速）
 
     Args:
-        args: (input_path, output_dir, section_key, start, end)
+        pdf: pikepdf.open() 済みの入力PDF
 
     Returns:
-        (section_key, success, message)
+        分割できたらTrue（ページ範囲が空・逆順・範囲外の場合はFalse）
     """
-    input_path, output_dir, section_key, start, end = args
+    if not 1 <= first_page <= last_page <= len(pdf.pages):
+        return False
 
-    input_path = Path(input_path)
-    output_dir = Path(output_dir)
-
-    safe_name = section_key.replace("/", "・").replace("\\", "・")
-    pdf_path = output_dir / f"{safe_name}.pdf"
-    txt_path = output_dir / f"{safe_name}.txt"
-
-    # PDF分割
-    pdf_success = split_pdf_with_gs(input_path, pdf_path, start, end)
-
-    if not pdf_success:
-        return (section_key, False, "PDF分割失敗")
-
-    # テキスト抽出
-    text = extract_text_from_pdf(pdf_path)
-
-    if text:
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(text)
-        return (section_key, True, f"ページ {start}-{end}")
-    else:
-        return (section_key, True, f"ページ {start}-{end} (テキスト抽出失敗)")
+    out = pikepdf.Pdf.new()
+    out.pages.extend(pdf.pages[first_page - 1:last_page])
+    out.save(output_path)
+    return output_path.exists()
 
 
-def split_pdf_by_section(input_path: str, output_dir: str = None, workers: int = 4) -> dict:
+def split_pdf_by_section(input_path: str, output_dir: str = None, workers: int | None = None,
+                         force: bool = False) -> dict:
     """
     PDFを款セクションごとに分割する（ghostscript使用、並行処理）
 
     Args:
         input_path: 入力PDFファイルのパス
         output_dir: 出力ディレクトリ（指定なしの場合は入力ファイルと同じディレクトリに作成）
-        workers: 並行処理のワーカー数
+        workers: 並行処理のワーカー数（省略時はCPUコア数の2倍）
+        force: Trueなら、入力PDFが前回から変わっていなくても作り直す
 
     Returns:
         分割結果の辞書 {セクション名: (開始ページ, 終了ページ, 出力パス)}
@@ -248,13 +318,39 @@ def split_pdf_by_section(input_path: str, output_dir: str = None, workers: int =
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # PDFのページ数を取得
+    # 入力PDFが前回から変わっておらず、出力もすべて残っていれば何もしない
+    fingerprint = input_fingerprint(input_path)
+    summary_path = output_dir / "_summary.json"
+    if not force:
+        summary = load_up_to_date_summary(summary_path, fingerprint)
+        if summary is not None:
+            results = {
+                section["key"]: (*section["page_range"], str(output_dir / section["file"]))
+                for section in summary["sections"]
+            }
+            # PDFと、テキストを書き出したセクションはテキストファイルも残っていること
+            outputs = [output_dir / section["file"] for section in summary["sections"]]
+            outputs += [
+                output_dir / section["text_file"]
+                for section in summary["sections"]
+                if section.get("text_file")
+            ]
+            if all(path.exists() for path in outputs):
+                print(f"入力PDFに変更がないため処理をスキップしました: {input_path}")
+                print(f"サマリー: {summary_path}")
+                return results
+
+    if workers is None:
+        workers = default_workers()
+
+    # PDF全体のテキストを1回だけ抽出する（ページ数はPDFのページ数と一致している）
     print(f"PDF解析中: {input_path}")
-    total_pages = get_pdf_page_count(input_path)
+    pages_text = load_pages_text(input_path, workers)
+    total_pages = len(pages_text)
     print(f"総ページ数（PDF）: {total_pages}")
 
     # PDFから直接款の位置を検出
-    transitions, last_kan_page = detect_kan_from_pdf(input_path, total_pages)
+    transitions, last_kan_page = detect_kan_from_pdf(pages_text)
 
     if not transitions:
         print("エラー: 款が検出できませんでした。")
@@ -279,38 +375,99 @@ def split_pdf_by_section(input_path: str, output_dir: str = None, workers: int =
         print("エラー: 款セクションが検出できませんでした。")
         sys.exit(1)
 
-    # 並行処理用のタスクを作成
-    tasks = []
+    # 出力ファイル名はセクションごとに1回だけ作る
+    safe_names = {section_key: safe_file_name(section_key) for section_key in section_ranges}
+
+    # pikepdfがあれば、入力PDFを1回だけ開いてページのコピーで分割する
+    split_done = set()
+    if pikepdf is not None:
+        print("\nPDF分割中（pikepdf）...")
+        with pikepdf.open(input_path) as pdf:
+            for section_key, (start, end) in section_ranges.items():
+                safe_name = safe_names[section_key]
+                try:
+                    if split_pdf_with_pikepdf(pdf, output_dir / f"{safe_name}.pdf", start, min(end, total_pages)):
+                        split_done.add(section_key)
+                except Exception as e:
+                    # 失敗したセクションは ghostscript で分割する
+                    print(f"  pikepdfでの分割に失敗: {safe_name}: {e}")
+
+    # テキスト書き出し（一括抽出したページテキストを使い、分割したPDFを読み直さない）
+    print("\nテキスト書き出し中...")
+    text_written = {}
     for section_key, (start, end) in section_ranges.items():
-        actual_end = min(end, total_pages)
-        tasks.append((str(input_path), str(output_dir), section_key, start, actual_end))
-
-    # PDF分割 + テキスト抽出を並行処理
-    print(f"\nPDF分割 + テキスト抽出中（{workers}ワーカー）...")
+        text = "".join(pages_text[start - 1:min(end, total_pages)])
+        if text:
+            txt_path = output_dir / f"{safe_names[section_key]}.txt"
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        text_written[section_key] = bool(text)
+
+    # pikepdfで分割できなかったセクションだけ ghostscript で並行して分割する
+    gs_tasks = [
+        (section_key, start, min(end, total_pages))
+        for section_key, (start, end) in section_ranges.items()
+        if section_key not in split_done
+    ]
+    pdf_success = {section_key: True for section_key in split_done}
+    if gs_tasks:
+        print(f"\nPDF分割中（ghostscript、{min(workers, len(gs_tasks))}ワーカー）...")
+        with ProcessPoolExecutor(max_workers=min(workers, len(gs_tasks))) as executor:
+            futures = {
+                executor.submit(split_pdf_with_gs, input_path,
+                                output_dir / f"{safe_names[section_key]}.pdf", start, end): section_key
+                for section_key, start, end in gs_tasks
+            }
+            for future in as_completed(futures):
+                section_key = futures[future]
+                try:
+                    pdf_success[section_key] = future.result()
+                except Exception as e:
+                    print(f"  ✗ {section_key}: {e}")
+
+    # セクションごとの結果
+    print("\n結果:")
     results = {}
     success_count = 0
     fail_count = 0
 
-    with ProcessPoolExecutor(max_workers=workers) as executor:
-        futures = {executor.submit(process_section, task): task[2] for task in tasks}
-
-        for future in as_completed(futures):
-            section_key = futures[future]
-            try:
-                key, success, message = future.result()
-                safe_name = key.replace("/", "・").replace("\\", "・")
-
-                if success:
-                    print(f"  ✓ {safe_name}: {message}")
-                    start, end = section_ranges[key]
-                    results[key] = (start, min(end, total_pages), str(output_dir / f"{safe_name}.pdf"))
-                    success_count += 1
-                else:
-                    print(f"  ✗ {safe_name}: {message}")
-                    fail_count += 1
-            except Exception as e:
-                print(f"  ✗ {section_key}: {e}")
-                fail_count += 1
+    for section_key, (start, end) in section_ranges.items():
+        if section_key not in pdf_success:
+            # ghostscriptの実行自体が例外で失敗したもの（上で表示済み）
+            fail_count += 1
+            continue
+
+        safe_name = safe_names[section_key]
+        end = min(end, total_pages)
+        if pdf_success[section_key]:
+            message = f"ページ {start}-{end}"
+            if not text_written[section_key]:
+                message += " (テキスト抽出失敗)"
+            print(f"  ✓ {safe_name}: {message}")
+            results[section_key] = (start, end, str(output_dir / f"{safe_name}.pdf"))
+            success_count += 1
+        else:
+            print(f"  ✗ {safe_name}: PDF分割失敗")
+            fail_count += 1
+
+    # サマリーファイルを作成（失敗したセクションがあれば、次回は作り直すよう指紋を残さない）
+    summary = {
+        "source_file": str(input_path),
+        "fingerprint": fingerprint if fail_count == 0 else None,
+        "total_pages": total_pages,
+        "sections": [
+            {
+                "key": key,
+                "page_range": [results[key][0], results[key][1]],
+                "file": f"{safe_names[key]}.pdf",
+                "text_file": f"{safe_names[key]}.txt" if text_written[key] else None
+            }
+            for key in section_ranges
+            if key in results
+        ]
+    }
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
 
     print(f"\n完了: {success_count} セクション（PDF + テキスト）を {output_dir} に保存しました")
     if fail_count > 0:
@@ -325,7 +482,8 @@ def main():
     )
     parser.add_argument("input_pdf", help="入力PDFファイルのパス")
     parser.add_argument("output_dir", nargs="?", default=None, help="出力ディレクトリ（省略時は入力ファイルと同じ場所に「分割」フォルダを作成）")
-    parser.add_argument("--workers", "-w", type=int, default=4, help="並行処理のワーカー数（デフォルト: 4）")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="並行処理のワーカー数（デフォルト: CPUコア数の2倍）")
+    parser.add_argument("--force", action="store_true", help="入力PDFが前回から変わっていなくても作り直す")
 
     args = parser.parse_args()
 
@@ -333,7 +491,7 @@ def main():
         print(f"エラー: ファイルが見つかりません: {args.input_pdf}")
         sys.exit(1)
 
-    split_pdf_by_section(args.input_pdf, args.output_dir, args.workers)
+    split_pdf_by_section(args.input_pdf, args.output_dir, args.workers, args.force)
 
 
 if __name__ == "__main__":